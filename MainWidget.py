@@ -4,6 +4,7 @@ import sys
 import os
 import re
 import time
+import multiprocessing
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
@@ -12,11 +13,14 @@ from src.DragWidget import DragWidget
 from src.FiltersWidget import FiltersWidget
 from src.SettingsWidget import SettingsWidget
 from src.Requester import Requester
+from src.JobQueue import JobQueue, JOB_SCAN, JOB_COUNT
 from src.PainterWidget import PainterWidget
 from src.ModsContainer import ModsContainer, DEFAULT_FILTER_PATH, PROJECT_ROOT
 from src.FilterManager import LogListener, FilterManager
 from src.utils import load_styles, initialize_logging, log_method_name
 
+COUNT_TIMEOUT = 60  # seconds, counting chaos items for filter refresh is cancelled after that
+
 
 class MainWidget(QMainWindow):
     def __init__(self, screen_geometry: QRect):
@@ -53,8 +57,17 @@ class MainWidget(QMainWindow):
         self.requester.moveToThread(self.objThread_requester)
         self.requester.finished.connect(self.objThread_requester.quit)
         self.requester.failed.connect(self._requester_failed)
+        self.requester.cancelled.connect(self.objThread_requester.quit)
+        self.requester.finished_counting_chaos.connect(self.objThread_requester.quit)
         self.objThread_requester.started.connect(self.requester.run)
         self.objThread_requester.finished.connect(self._requester_finished)
+
+        # All Requester work goes through the queue, so only one job runs at a time and repeated triggers are merged
+        self.job_queue = JobQueue(self.requester, {JOB_SCAN: self._start_scan, JOB_COUNT: self._start_count})
+        self.objThread_requester.finished.connect(self.job_queue.job_finished)
+        self.count_timer = QTimer()
+        self.count_timer.setSingleShot(True)
+        self.count_timer.timeout.connect(self._count_timed_out)
         # self.requester.start()
 
         # Setup log listener and filter manager
@@ -63,6 +76,7 @@ class MainWidget(QMainWindow):
         self.logListener.entered_map.connect(self._request_count_chaos_items)
         self.requester.finished_counting_chaos.connect(self._request_process_chaos_counters)
         self.logListener.start()
+        QCoreApplication.instance().aboutToQuit.connect(self._shutdown)
 
         # Setup main widget UI
         self.screen_geometry = screen_geometry
@@ -153,6 +167,18 @@ class MainWidget(QMainWindow):
         widget.setLayout(layout)
         self.setCentralWidget(widget)
 
+        # Show frames from stashes saved during last run right away, new request can be sent with run button
+        if self.requester.has_snapshots():
+            self.requester.force_offline = True
+            self._run_requester()
+
+    # Running job is cancelled and waited for, then Requester closes its scoring processes and session
+    def _shutdown(self) -> None:
+        self.requester.cancel()
+        self.objThread_requester.quit()
+        self.objThread_requester.wait()
+        self.requester.shutdown()
+
     def _prepare_stash_switch(self, layout):
         stash_switch_layout = QHBoxLayout()
         self.stash_switch_button_left = QPushButton()
@@ -227,11 +253,29 @@ class MainWidget(QMainWindow):
         if now - self.last_requested_time < 1:
             return
         self.last_requested_time = now
+        self.job_queue.submit(JOB_SCAN)
+
+    def _start_scan(self) -> None:
+        self.requester.job = JOB_SCAN
         icon = QIcon()
         icon.addPixmap(QPixmap(self.image_path + 'timer.png'))
         self.run_button.setIcon(icon)
         self.objThread_requester.start()
 
+    # Counting runs on Requester thread like scans, the filter is reloaded when finished_counting_chaos arrives
+    def _start_count(self) -> None:
+        self.requester.job = JOB_COUNT
+        icon = QIcon()
+        icon.addPixmap(QPixmap(self.image_path + 'timer.png'))
+        self.filter_reload_button.setIcon(icon)
+        self.filter_reload_button.setToolTip("Refreshing chaos recipe filter...")
+        self.count_timer.start(COUNT_TIMEOUT * 1000)
+        self.objThread_requester.start()
+
+    def _count_timed_out(self) -> None:
+        self.requester.cancel()
+        self._show_error_window("Refreshing chaos recipe filter took longer than {} seconds".format(COUNT_TIMEOUT))
+
     def _show_error_window(self, error_message: str) -> None:
 
         # Break message with new lines if it is too long
@@ -256,7 +300,13 @@ class MainWidget(QMainWindow):
         self.last_requested_time = 0
 
     def _requester_finished(self):
+        if self.job_queue.current == JOB_COUNT:
+            self.count_timer.stop()
+            self._set_filter_reload_button_icon_refresh()
+            return
         self._set_run_button_icon_run()
+        if self.requester.cancel_requested:
+            return  # Job was replaced by a newer one, painter will get its results
         self.painter_widget.paint_items()
         self.painter_widget.update()
         self.show_hide_widget(self.painter_widget, True)
@@ -267,6 +317,12 @@ class MainWidget(QMainWindow):
         icon.addPixmap(QPixmap(self.image_path + 'run.png'))
         self.run_button.setIcon(icon)
 
+    def _set_filter_reload_button_icon_refresh(self) -> None:
+        icon = QIcon()
+        icon.addPixmap(QPixmap(self.image_path + 'refresh.png'))
+        self.filter_reload_button.setIcon(icon)
+        self.filter_reload_button.setToolTip("Refresh chaos recipe filter")
+
     # Send new position to SettingsWidget and save it
     def update_pos_size(self) -> None:
         self.settings_widget.main_widget_y = self.y()
@@ -301,13 +357,14 @@ class MainWidget(QMainWindow):
 
     def _request_count_chaos_items(self, auto_reload=False):
         if self.settings_widget.mode == "chaos_recipe" and (not auto_reload or self.settings_widget.auto_reload_filter):
-            self.requester.count_chaos_items()
+            self.job_queue.submit(JOB_COUNT)
 
     def _request_process_chaos_counters(self, counters):
         self.filter_manager.reload_filter(counters)
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Scoring processes have to work in executable built by PyInstaller
     app = QApplication(sys.argv)
     window = MainWidget(app.desktop().screenGeometry())
     window.show()
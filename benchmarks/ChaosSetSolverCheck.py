@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+# Checks ChaosSetSolver against the greedy create_chaos_sets() it replaced, kept below as GreedyReference,
+# and measures both. For random pools of items every solver set has to be complete (all slots, two rings,
+# two-handed weapon or two one-handed ones), no item can be used twice, every set needs a chaos item (exactly one
+# with one_chaos_item) and there have to be at least as many sets as greedy made. Exits with 1 on any failure.
+# Run from repository root:
+#   python -m benchmarks.ChaosSetSolverCheck --pools 3000
+
+import argparse
+import copy
+import random
+import sys
+import time
+from collections import OrderedDict
+from src.ChaosSetSolver import ChaosSetSolver, SET_SLOTS
+from src.Item import Item
+from src.ModsContainer import chaos_recipe_slots, one_handed, two_handed
+
+category2_of_slot = {'weapon': one_handed + two_handed}
+category2_of_slot.update({slot: [slot] for slot in SET_SLOTS if slot != 'weapon'})
+
+
+# Requester.split_items_to_dicts() and create_chaos_sets() as they were before ChaosSetSolver, unchanged apart from
+# taking items and fill_greedy as arguments. Sets are deep copies, so they are only counted and checked.
+class GreedyReference:
+    def __init__(self, items: list, fill_greedy: bool):
+        self.items = list(items)
+        self.fill_greedy = fill_greedy
+        self.chaos_sets = []
+
+    def split_items_to_dicts(self) -> [dict, dict]:
+        items_chaos = {}
+        items_regal = {}
+        for item in self.items:
+            if item.ilvl < 60:
+                self.items.remove(item)
+                continue
+            elif 60 <= item.ilvl <= 74:
+                items = items_chaos
+            else:
+                items = items_regal
+
+            if item.category2 in one_handed or item.category2 in two_handed:
+                items.setdefault('weapon', []).append(item)
+            elif item.category2 == 'helmet':
+                items.setdefault('helmet', []).append(item)
+            elif item.category2 == 'chest':
+                items.setdefault('chest', []).append(item)
+            elif item.category2 == 'gloves':
+                items.setdefault('gloves', []).append(item)
+            elif item.category2 == 'boots':
+                items.setdefault('boots', []).append(item)
+            elif item.category2 == 'belt':
+                items.setdefault('belt', []).append(item)
+            elif item.category2 == 'amulet':
+                items.setdefault('amulet', []).append(item)
+            elif item.category2 == 'ring':
+                items.setdefault('ring', []).append(item)
+
+        items_regal = OrderedDict(sorted(items_regal.items(), key=lambda x: len(x[1])))
+        items_chaos = OrderedDict(sorted(items_chaos.items(), key=lambda x: len(x[1])))
+        return items_regal, items_chaos
+
+    def create_chaos_sets(self) -> None:
+        items_regal, items_chaos = self.split_items_to_dicts()
+        set_tmp = {'weapon': [], 'ring': [], 'helmet': [], 'chest': [], 'gloves': [], 'boots': [],
+                   'belt': [], 'amulet': []}
+
+        while len(items_chaos.values()) > 0:
+            # Fill set with regal items
+            regal_tmp = list(items_regal.items())
+            for key, values in regal_tmp:
+                if not set_tmp[key] and len(items_regal[key]) > 0:
+                    set_tmp[key].append(values[0])
+                    items_regal[key].remove(values[0])
+                    if key == 'ring':
+                        if len(items_regal[key]) > 0:
+                            set_tmp[key].append(values[0])
+                            items_regal[key].remove(values[0])
+                    if key == 'weapon' and set_tmp[key][0].category2 in one_handed and items_regal[key]:
+                        try:
+                            weapon_tmp_one = next(x for x in iter(items_regal[key]) if x.category2 in one_handed)
+                        except StopIteration as e:
+                            weapon_tmp_one = None
+                        if weapon_tmp_one:
+                            set_tmp[key].append(weapon_tmp_one)
+                            items_regal[key].remove(weapon_tmp_one)
+
+            # Fill in with chaos items
+            chaos_added = 0
+            for key in set_tmp:
+                if key in items_chaos:
+                    if not set_tmp[key]:
+                        if len(items_chaos[key]) > 0:
+                            item_tmp = items_chaos[key][-1]
+                            set_tmp[key].append(item_tmp)
+                            items_chaos[key].pop(-1)
+                            chaos_added += 1
+                            if item_tmp.category2 == "ring":
+                                if len(items_chaos[key]) > 0:
+                                    item_tmp = items_chaos[key][-1]
+                                    set_tmp[key].append(item_tmp)
+                                    items_chaos[key].pop(-1)
+                                    chaos_added += 1
+                                else:
+                                    return
+                            elif item_tmp.category2 in one_handed and items_chaos[key]:
+                                try:
+                                    weapon_tmp_one = next(x for x in iter(items_chaos[key]) if x.category2 in one_handed)
+                                except StopIteration as e:
+                                    weapon_tmp_one = None
+                                if weapon_tmp_one:
+                                    set_tmp[key].append(weapon_tmp_one)
+                                    items_chaos[key].remove(weapon_tmp_one)
+                                    chaos_added += 1
+                        else:
+                            return
+                    elif key == 'ring' and len(set_tmp[key]) < 2:
+                        if len(items_chaos[key]) > 0:
+                            set_tmp[key].append(items_chaos[key][-1])
+                            items_chaos[key].pop(-1)
+                            chaos_added += 1
+                        else:
+                            return
+                    elif key == 'weapon' and len(set_tmp[key]) < 2 \
+                            and set_tmp[key][0].category2 in one_handed:
+                        if len(items_chaos[key]) > 0:
+                            weapon_tmp_one = next(x for x in iter(items_chaos[key]) if x.category2 in one_handed)
+                            if weapon_tmp_one:
+                                set_tmp[key].append(weapon_tmp_one)
+                                items_chaos[key].remove(weapon_tmp_one)
+                                chaos_added += 1
+                            else:
+                                return
+                        else:
+                            return
+
+            # If all items are from regal recipe replace one of them with chaos recipe item
+            if chaos_added == 0:
+                most_common_chaos = list(items_chaos.keys())[-1]
+                if items_chaos[most_common_chaos]:
+                    items_regal[most_common_chaos].append(set_tmp[most_common_chaos][0])
+                    set_tmp[most_common_chaos][0] = items_chaos[most_common_chaos][-1]
+                    items_chaos[most_common_chaos].pop(-1)
+                    chaos_added += 1
+                else:
+                    return
+
+            if chaos_added > 1 and not self.fill_greedy:
+                return
+
+            # Do not add set if there is any item missing
+            if any(value == [] for value in set_tmp.values()) or len(set_tmp['ring']) < 2 or \
+                    (set_tmp['weapon'][0].category2 in one_handed and len(set_tmp['weapon']) < 2):
+                return
+
+            self.chaos_sets.append(copy.deepcopy(set_tmp))
+            set_tmp = {'weapon': [], 'ring': [], 'helmet': [], 'chest': [], 'gloves': [], 'boots': [],
+                       'belt': [], 'amulet': []}
+
+
+def make_item(category2: str, ilvl: int) -> Item:
+    item = Item()
+    item.category2 = category2
+    item.ilvl = ilvl
+    return item
+
+
+# Random pool, each slot gets from 0 to max_per_slot items (rings and weapons twice as many), ilvl 60-86
+def generate_pool(max_per_slot: int) -> list:
+    items = []
+    for slot, categories in category2_of_slot.items():
+        count = random.randint(0, max_per_slot * (2 if slot in ('ring', 'weapon') else 1))
+        chaos_share = random.random()
+        for _ in range(count):
+            ilvl = random.randint(60, 74) if random.random() < chaos_share else random.randint(75, 86)
+            items.append(make_item(random.choice(categories), ilvl))
+    return items
+
+
+def split_pool(items: list) -> tuple:
+    items_chaos, items_regal = {}, {}
+    for item in items:
+        (items_chaos if item.ilvl <= 74 else items_regal).setdefault(chaos_recipe_slots[item.category2], []).append(item)
+    return items_chaos, items_regal
+
+
+def solve(items: list, one_chaos_item: bool) -> list:
+    return ChaosSetSolver(*split_pool(items)).solve(one_chaos_item=one_chaos_item)
+
+
+# Returns (number of sets, True if greedy code crashed), sets made before a crash are counted
+def greedy(items: list, one_chaos_item: bool) -> tuple:
+    reference = GreedyReference(items, fill_greedy=not one_chaos_item)
+    try:
+        reference.create_chaos_sets()
+    except (StopIteration, KeyError, IndexError):
+        return len(reference.chaos_sets), True
+    return len(reference.chaos_sets), False
+
+
+# Returns description of the first broken rule, None if sets are fine
+def check_sets(sets: list, items: list, one_chaos_item: bool):
+    pool = set(map(id, items))
+    used = set()
+    for chaos_set in sets:
+        if sorted(chaos_set) != sorted(SET_SLOTS) or any(not chaos_set[slot] for slot in SET_SLOTS):
+            return 'incomplete set'
+        if len(chaos_set['ring']) != 2:
+            return 'set without two rings'
+        weapons = chaos_set['weapon']
+        if not ((len(weapons) == 1 and weapons[0].category2 in two_handed) or
+                (len(weapons) == 2 and all(weapon.category2 in one_handed for weapon in weapons))):
+            return 'wrong weapons'
+        for slot, unit in chaos_set.items():
+            for item in unit:
+                if chaos_recipe_slots.get(item.category2) != slot:
+                    return 'item in wrong slot'
+                if id(item) not in pool:
+                    return 'item not from the pool'
+                if id(item) in used:
+                    return 'item used twice'
+                used.add(id(item))
+        chaos_items = sum(item.ilvl <= 74 for unit in chaos_set.values() for item in unit)
+        if chaos_items < 1 or (one_chaos_item and chaos_items != 1):
+            return 'wrong number of chaos items: {}'.format(chaos_items)
+    return None
+
+
+def check(pools: int, max_per_slot: int) -> bool:
+    ok = True
+    for one_chaos_item in (False, True):
+        solver_total = greedy_total = better = greedy_crashes = 0
+        for _ in range(pools):
+            items = generate_pool(max_per_slot)
+            sets = solve(items, one_chaos_item)
+            greedy_sets, crashed = greedy(items, one_chaos_item)
+            greedy_crashes += crashed
+            problem = check_sets(sets, items, one_chaos_item)
+            if problem is None and len(sets) < greedy_sets:
+                problem = 'fewer sets than greedy: {} < {}'.format(len(sets), greedy_sets)
+            if problem:
+                ok = False
+                print('FAIL one_chaos_item={} pool of {} items: {}'.format(one_chaos_item, len(items), problem))
+            solver_total += len(sets)
+            greedy_total += greedy_sets
+            better += len(sets) > greedy_sets
+        print('one_chaos_item={}: {} pools, solver {} sets, greedy {} sets (crashed in {} pools), '
+              'solver better in {} pools'.format(one_chaos_item, pools, solver_total, greedy_total, greedy_crashes,
+                                                  better))
+    return ok
+
+
+def benchmark(sizes: list) -> None:
+    print('{:>8}{:>14}{:>14}{:>14}{:>14}'.format('items', 'solver sets', 'solver ms', 'greedy sets', 'greedy ms'))
+    for size in sizes:
+        items = [make_item(random.choice(category2_of_slot[slot]), random.choice([65, 80, 80]))
+                 for slot in SET_SLOTS for _ in range(size // len(SET_SLOTS) * (2 if slot in ('ring', 'weapon') else 1))]
+        start = time.perf_counter()
+        sets = solve(items, False)
+        solver_time = time.perf_counter() - start
+        start = time.perf_counter()
+        greedy_sets, crashed = greedy(items, False)
+        greedy_time = time.perf_counter() - start
+        print('{:>8}{:>14}{:>14.1f}{:>14}{:>14.1f}{}'.format(len(items), len(sets), solver_time * 1000, greedy_sets,
+                                                             greedy_time * 1000, '  (crashed)' if crashed else ''))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='ChaosSetSolver check against greedy sets and benchmark')
+    parser.add_argument('--pools', type=int, default=3000, help='random pools checked in each mode')
+    parser.add_argument('--max-per-slot', type=int, default=12)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000, 20000],
+                        help='approximate numbers of items for the benchmark')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    ok = check(args.pools, args.max_per_slot)
+    benchmark(args.sizes)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
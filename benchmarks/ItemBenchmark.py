@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+# Measures memory and construction time of Item records for one quad tab (576 cells) and a scan of many tabs.
+# Items are built from synthetic stashes the same way Requester.process_item_data() builds them (without importing
+# Qt), and compared with the plain object Item used before it got __slots__. Run from repository root:
+#   python -m benchmarks.ItemBenchmark --tabs 20
+
+import argparse
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from src.BaseIndex import base_index
+from src.Item import Item
+from src.ModsContainer import ModsContainer
+from src.StandInServer import generate_stash
+
+
+# Item as it was before __slots__: every instance has its own dict, two defaultdicts and a list
+class PlainItem:
+    def __init__(self):
+        self.x = None
+        self.y = None
+        self.height = None
+        self.width = None
+        self.ilvl = None
+        self.category1 = None
+        self.category2 = None
+        self.base = None
+        self.name = None
+        self.score = 0
+        self.explicits = []
+        self.implicits = []
+        self.totals = defaultdict(float)
+        self.mods_matched = defaultdict(float)
+        self.unsupported_mods = []
+        self.geometry = None
+
+
+# Same fields as Requester.copy_info() and determine_categories()
+def build_item(item_data: dict) -> Item:
+    item = Item()
+    item.x = item_data['x']
+    item.y = item_data['y']
+    item.height = item_data['h']
+    item.width = item_data['w']
+    item.ilvl = item_data['ilvl']
+    item.stash_name = 'Stash1'
+    if 'explicitMods' in item_data:
+        item.explicits = ModsContainer.normalize_mods(item_data['explicitMods'])
+    found = base_index.resolve(str(item_data['typeLine']), item_data.get('baseType'))
+    if found:
+        item.category1, item.category2, item.base = found
+    item.name = item_data['name']
+    return item
+
+
+# Fields as the old Requester filled them, categories were copied strings
+def build_plain_item(item_data: dict) -> PlainItem:
+    item = PlainItem()
+    item.x = item_data['x']
+    item.y = item_data['y']
+    item.height = item_data['h']
+    item.width = item_data['w']
+    item.ilvl = item_data['ilvl']
+    if 'explicitMods' in item_data:
+        item.explicits = str(item_data['explicitMods']).lower().split(',')
+    found = base_index.resolve(str(item_data['typeLine']), item_data.get('baseType'))
+    if found:
+        item.category1, item.category2, item.base = (''.join(list(value)) for value in found)
+    item.name = item_data['name']
+    return item
+
+
+def measure(build, items_data: list, repeat: int) -> tuple:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = [build(item_data) for item_data in items_data]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    del items
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [build(item_data) for item_data in items_data]
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return memory / len(items), best / len(items) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Item memory and construction time')
+    parser.add_argument('--tabs', type=int, default=20, help='number of quad tabs in the big scan')
+    parser.add_argument('--repeat', type=int, default=5, help='best of N runs is reported')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    quad_tab = generate_stash(576, True)
+    scan = quad_tab + [item_data for _ in range(args.tabs - 1) for item_data in generate_stash(576, True)]
+    print('{:<16}{:>8}{:>14}{:>14}{:>16}{:>16}'.format('data', 'items', 'Item B', 'plain B', 'Item us', 'plain us'))
+    for name, items_data in (('quad tab', quad_tab), ('{} tabs'.format(args.tabs), scan)):
+        ModsContainer.parse_mod.cache_clear()  # Both runs start with empty mod cache
+        item_memory, item_time = measure(build_item, items_data, args.repeat)
+        plain_memory, plain_time = measure(build_plain_item, items_data, args.repeat)
+        print('{:<16}{:>8}{:>14.0f}{:>14.0f}{:>16.2f}{:>16.2f}'.format(name, len(items_data), item_memory,
+                                                                       plain_memory, item_time, plain_time))
+
+
+if __name__ == '__main__':
+    main()
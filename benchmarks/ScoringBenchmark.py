@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# Measures rare scanner scoring on 1k-50k synthetic items with the default filter (filters/mods.xml):
+#   per item  - match_mods() called item by item with its category filter, as Item.calculate_mods() used to do
+#   batch     - ItemScorer.score(), used by Requester
+#   matrix    - NumPy item x mod value matrix compared with per-category threshold rows (needs numpy),
+#               kept here as the reference for choosing the batch loop; results are turned back into mods_matched
+#   pool      - ScoringPool with --processes workers (only with --processes 2 or more)
+# All variants are checked to produce the same mods_matched. Run from repository root:
+#   python -m benchmarks.ScoringBenchmark --sizes 1000 10000 50000
+
+import argparse
+import gc
+import random
+import re
+import time
+import xml.etree.ElementTree as ElementTree
+from src.BaseIndex import base_index
+from src.Item import Item
+from src.ItemScorer import ItemScorer
+from src.ModsContainer import ModsContainer, DEFAULT_FILTER_PATH
+from src.StandInServer import generate_stash
+
+try:
+    import numpy
+except ModuleNotFoundError:
+    numpy = None
+
+NUMBER = re.compile(r'\d+(\.\d+)?')
+
+
+# Items with mods taken from the filter with random values, so a good part of them is matched
+def generate_items(count: int, filter_mods: list) -> list:
+    items = []
+    while len(items) < count:
+        for item_data in generate_stash(576, True):
+            found = base_index.resolve(item_data['typeLine'], item_data.get('baseType'))
+            if not found:
+                continue
+            item = Item()
+            item.category1, item.category2, item.base = found
+            mods = [NUMBER.sub(lambda match: str(random.randint(1, 150)), random.choice(filter_mods))
+                    for _ in range(random.randint(1, 6))]
+            item.explicits = ModsContainer.normalize_mods(mods)
+            items.append(item)
+            if len(items) == count:
+                break
+    return items
+
+
+def score_per_item(items: list) -> None:
+    for item in items:
+        if item.base:
+            item.mods_matched, item.totals = ItemScorer.match_mods(
+                item.explicits, *ItemScorer.get_category_filter((item.category1, item.category2)))
+
+
+# Filter thresholds only, the default filter has no total mods
+def score_matrix(items: list) -> None:
+    category_codes, mod_codes = {}, {}
+    rows, columns, values = [], [], []
+    item_categories = numpy.empty(len(items), numpy.int32)
+    for row, item in enumerate(items):
+        item_categories[row] = category_codes.setdefault((item.category1, item.category2), len(category_codes))
+        for mod, value in item.explicits:
+            rows.append(row)
+            columns.append(mod_codes.setdefault(mod, len(mod_codes)))
+            values.append(value)
+    thresholds = numpy.zeros((len(category_codes), len(mod_codes)))
+    for category, code in category_codes.items():
+        for mod, value in ModsContainer.get_thresholds(*category).items():
+            if mod in mod_codes and value > 0:
+                thresholds[code, mod_codes[mod]] = value
+    rows, columns, values = numpy.array(rows), numpy.array(columns), numpy.array(values, float)
+    expected = thresholds[item_categories[rows], columns]
+    matched = (expected > 0) & (values >= expected)
+
+    mod_names = list(mod_codes)
+    for item in items:
+        item.mods_matched = {}
+    for row, column, value in zip(rows[matched].tolist(), columns[matched].tolist(), values[matched].tolist()):
+        items[row].mods_matched[mod_names[column]] = value
+
+
+def run(name: str, score, items: list, repeat: int, expected: list) -> list:
+    best = None
+    for _ in range(repeat):
+        for item in items:
+            item.mods_matched, item.totals = None, None
+        gc.collect()
+        start = time.perf_counter()
+        score(items)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    results = [dict(item.mods_matched) for item in items]
+    if expected is None:
+        check = 'reference'
+    else:
+        check = 'same results' if results == expected else 'RESULTS DIFFER'
+    print('{:>8}  {:<10}{:>10.1f} ms{:>10.2f} us/item  {}'.format(
+        len(items), name, best * 1000, best / len(items) * 1e6, check))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Rare scanner scoring speed')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000, 50000])
+    parser.add_argument('--repeat', type=int, default=3, help='best of N runs is reported')
+    parser.add_argument('--processes', type=int, default=0, help='also measure ScoringPool with N processes')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    ModsContainer.load_mods_config(DEFAULT_FILTER_PATH)
+    filter_mods = [mod.text for mod in ElementTree.parse(DEFAULT_FILTER_PATH).getroot().iter('mod') if mod.text]
+    pool = None
+    if args.processes >= 2:
+        from src.ScoringPool import ScoringPool
+        pool = ScoringPool(args.processes)
+    if numpy is None:
+        print('numpy is not installed, matrix variant is skipped')
+    for size in args.sizes:
+        items = generate_items(size, filter_mods)
+        expected = run('per item', score_per_item, items, args.repeat, None)
+        run('batch', ItemScorer.score, items, args.repeat, expected)
+        if numpy is not None:
+            run('matrix', score_matrix, items, args.repeat, expected)
+        if pool:
+            run('pool', pool.score, items, args.repeat, expected)
+    if pool:
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
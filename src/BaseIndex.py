@@ -0,0 +1,49 @@
+import sys
+from src.ModsContainer import item_bases
+
+MAX_RESOLVED_TYPE_LINES = 10000
+_MISSING = object()  # Cached result can be None, so misses are told apart with this
+
+
+# Finds category1, category2 and base of an item in item_bases without scanning all of them.
+# Rare items have exact base in baseType, magic items carry affix words in typeLine (e.g. "Seething Leather Belt of
+# the Whelpling"), so for them the longest sequence of words which is a known base wins. Bases are compared as whole
+# words, so "Sai" doesn't match "Saint's Hauberk" and "Silk Robe" doesn't match "Spidersilk Robe".
+class BaseIndex:
+    def __init__(self, bases: dict):
+        self.bases = {}  # lowercase base -> (category1, category2, base)
+        for category1 in bases:
+            for category2 in bases[category1]:
+                for base in bases[category1][category2]:
+                    self.bases[base.lower()] = (sys.intern(category1.lower()), sys.intern(category2.lower()),
+                                                sys.intern(base))
+        self.max_words = max(len(base.split()) for base in self.bases)
+        # typeLine -> result, stash items share their type lines a lot. Tab workers resolve and clear it at the same
+        # time, so it is read with a single get()
+        self.resolved = {}
+
+    # Returns (category1, category2, base), None if base is unknown
+    def resolve(self, type_line: str, base_type: str = None) -> tuple:
+        if base_type:
+            found = self.bases.get(base_type.lower())
+            if found:
+                return found
+        found = self.resolved.get(type_line, _MISSING)
+        if found is not _MISSING:
+            return found
+        found = self._longest_match(type_line.lower().split())
+        if len(self.resolved) >= MAX_RESOLVED_TYPE_LINES:
+            self.resolved.clear()
+        self.resolved[type_line] = found
+        return found
+
+    def _longest_match(self, words: list) -> tuple:
+        for length in range(min(self.max_words, len(words)), 0, -1):
+            for start in range(len(words) - length + 1):
+                found = self.bases.get(' '.join(words[start:start + length]))
+                if found:
+                    return found
+        return None
+
+
+base_index = BaseIndex(item_bases)
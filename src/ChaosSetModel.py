@@ -0,0 +1,187 @@
+from threading import Lock
+from src.ModsContainer import chaos_recipe_slots, one_handed, two_handed
+from src.ChaosSetSolver import ChaosSetSolver, SET_SLOTS
+
+
+def is_chaos_item(item) -> bool:
+    return item.ilvl <= 74
+
+
+# Chaos recipe sets kept between runs. New scan is compared with the previous one (unchanged items are the same Item
+# objects thanks to Requester item cache) and only sets which lost an item are changed: the item is replaced with
+# a spare one (item not used by any set) or the set is dissolved to spares. New sets are made only from spares
+# and are put in front of the list, so the set shown by PainterWidget (the last one) doesn't change under the user.
+# Items clicked in the overlay are collected: they leave their set without replacement, like before the model existed.
+class ChaosSetModel:
+    def __init__(self):
+        # Sets read by PainterWidget on GUI thread, same format as ChaosSetSolver.solve(). A new list with copies of
+        # sets is assigned after each change and never modified, the model works on _sets.
+        self.sets = []
+        self._sets = []
+        self.spares = {slot: [] for slot in SET_SLOTS}
+        self.items = {}  # All items known to the model in insertion order, used as ordered set
+        self.one_chaos_item = None
+        self.stash_names = []  # Order of tabs in pick lists
+        self.collecting = None  # Set from which user already picked up items, it is not re-balanced anymore
+        self._set_of = {}  # item -> set containing it
+        self._lock = Lock()  # Runs update on Requester thread, clicks come from GUI thread
+
+    def update(self, items_chaos: dict, items_regal: dict, one_chaos_item: bool, stash_names: list = ()) -> None:
+        self.stash_names = list(stash_names)
+        new_items = dict.fromkeys(item for items in (items_chaos, items_regal) for slot in SET_SLOTS
+                                  for item in items.get(slot, ()))
+        with self._lock:
+            if one_chaos_item != self.one_chaos_item or not any(item in self.items for item in new_items):
+                self._rebuild(items_chaos, items_regal, one_chaos_item)
+                self.items = new_items
+                self._publish()
+                return
+            for item in new_items:
+                if item not in self.items:
+                    self.spares[chaos_recipe_slots[item.category2]].append(item)
+            for item in self.items:
+                if item not in new_items:
+                    self._remove(item)
+            self.items = new_items
+            self._make_new_sets()
+            self._solve_again_if_better()
+            self._publish()
+
+    # Item was picked up from stash by the user, its set is finished without it
+    def collect_item(self, item) -> None:
+        with self._lock:
+            self.items.pop(item, None)
+            chaos_set = self._set_of.pop(item, None)
+            if chaos_set is None:
+                return
+            self._unit_of(chaos_set, item).remove(item)
+            self.collecting = chaos_set
+            if not any(chaos_set.values()):
+                self._drop_set(chaos_set)
+            self._publish()
+
+    # Items of a set grouped by stash tab in order of configured tabs, items of each tab from the top left corner.
+    # Sets are made from items of all tabs, so the user can pick up a whole set going through tabs one by one.
+    def pick_list(self, chaos_set: dict) -> list:
+        tabs = {}
+        for unit in chaos_set.values():
+            for item in unit:
+                tabs.setdefault(item.stash_name or '', []).append(item)
+        order = {stash_name: index for index, stash_name in enumerate(self.stash_names)}
+        return [(stash_name, sorted(items, key=lambda item: (item.y, item.x)))
+                for stash_name, items in sorted(tabs.items(), key=lambda tab: order.get(tab[0], len(order)))]
+
+    def _publish(self) -> None:
+        self.sets = [{slot: list(unit) for slot, unit in chaos_set.items()} for chaos_set in self._sets]
+
+    def _rebuild(self, items_chaos: dict, items_regal: dict, one_chaos_item: bool) -> None:
+        self.one_chaos_item = one_chaos_item
+        self.collecting = None
+        self._use_sets(ChaosSetSolver(items_chaos, items_regal).solve(one_chaos_item=one_chaos_item),
+                       items_chaos, items_regal)
+
+    def _use_sets(self, sets: list, items_chaos: dict, items_regal: dict) -> None:
+        self._sets[:] = sets
+        self._set_of = {item: chaos_set for chaos_set in self._sets for unit in chaos_set.values() for item in unit}
+        for slot in SET_SLOTS:
+            self.spares[slot] = [item for items in (items_chaos, items_regal) for item in items.get(slot, ())
+                                 if item not in self._set_of]
+
+    # Replacing items one by one and making sets only from spares can end with fewer sets than all items allow.
+    # Solver is fast compared to requesting stashes, so all items (but the set being collected) are solved again
+    # and the result is used only if it has more sets, otherwise sets stay as they are.
+    def _solve_again_if_better(self) -> None:
+        collecting = self.collecting
+        items_chaos, items_regal = {}, {}
+        for item in self.items:
+            if collecting is None or self._set_of.get(item) is not collecting:
+                items = items_chaos if is_chaos_item(item) else items_regal
+                items.setdefault(chaos_recipe_slots[item.category2], []).append(item)
+        sets = ChaosSetSolver(items_chaos, items_regal).solve(one_chaos_item=self.one_chaos_item)
+        if len(sets) <= len(self._sets) - (collecting is not None):
+            return
+        self._use_sets(sets, items_chaos, items_regal)
+        if collecting is not None:
+            self._sets.append(collecting)
+            for unit in collecting.values():
+                for item in unit:
+                    self._set_of[item] = collecting
+
+    # Item is not in stash anymore
+    def _remove(self, item) -> None:
+        slot = chaos_recipe_slots[item.category2]
+        chaos_set = self._set_of.pop(item, None)
+        if chaos_set is None:
+            self.spares[slot].remove(item)
+            return
+        unit = self._unit_of(chaos_set, item)
+        unit.remove(item)
+        if chaos_set is self.collecting:
+            if not any(chaos_set.values()):
+                self._drop_set(chaos_set)
+            return  # Picked up without clicking in the overlay
+        for replacement in self._spare_units(slot, unit, item):
+            unit.extend(replacement)
+            if self._is_valid(chaos_set):
+                for spare in replacement:
+                    self.spares[slot].remove(spare)
+                    self._set_of[spare] = chaos_set
+                return
+            del unit[len(unit) - len(replacement):]
+        self._dissolve(chaos_set)
+
+    # Possible replacements for removed item, unit holds items that are left from its ring pair or weapons
+    def _spare_units(self, slot: str, unit: list, removed) -> list:
+        if slot == 'weapon':
+            if unit:  # Other one-handed weapon of the pair stays
+                return self._spare_items(slot, one_handed, removed)
+            units = self._spare_items(slot, two_handed, removed)
+            chaos = [item for item in self.spares[slot] if item.category2 in one_handed and is_chaos_item(item)][:2]
+            regal = [item for item in self.spares[slot] if item.category2 in one_handed and not is_chaos_item(item)][:2]
+            for chaos_count in range(3):  # Regal weapons first, chaos items are needed more
+                if len(chaos) >= chaos_count and len(regal) >= 2 - chaos_count:
+                    units.append(chaos[:chaos_count] + regal[:2 - chaos_count])
+            return units
+        return self._spare_items(slot, None, removed)
+
+    # One spare item of each kind (chaos, regal), the kind of removed item first to keep balance of spares
+    def _spare_items(self, slot: str, categories, removed) -> list:
+        first = {}
+        for item in self.spares[slot]:
+            if categories is None or item.category2 in categories:
+                first.setdefault(is_chaos_item(item), item)
+        return [[first[kind]] for kind in sorted(first, key=lambda kind: kind != is_chaos_item(removed))]
+
+    def _is_valid(self, chaos_set: dict) -> bool:
+        chaos_items = sum(is_chaos_item(item) for unit in chaos_set.values() for item in unit)
+        return chaos_items == 1 if self.one_chaos_item else chaos_items >= 1
+
+    def _dissolve(self, chaos_set: dict) -> None:
+        for slot, unit in chaos_set.items():
+            for item in unit:
+                del self._set_of[item]
+                self.spares[slot].append(item)
+        self._drop_set(chaos_set)
+
+    def _drop_set(self, chaos_set: dict) -> None:
+        self._sets[:] = [other for other in self._sets if other is not chaos_set]
+        if chaos_set is self.collecting:
+            self.collecting = None
+
+    def _make_new_sets(self) -> None:
+        items_chaos = {slot: [item for item in items if is_chaos_item(item)] for slot, items in self.spares.items()}
+        items_regal = {slot: [item for item in items if not is_chaos_item(item)] for slot, items in self.spares.items()}
+        new_sets = ChaosSetSolver(items_chaos, items_regal).solve(one_chaos_item=self.one_chaos_item)
+        if not new_sets:
+            return
+        for chaos_set in new_sets:
+            for unit in chaos_set.values():
+                for item in unit:
+                    self._set_of[item] = chaos_set
+        for slot in SET_SLOTS:
+            self.spares[slot] = [item for item in self.spares[slot] if item not in self._set_of]
+        self._sets[:0] = new_sets
+
+    @staticmethod
+    def _unit_of(chaos_set: dict, item) -> list:
+        return chaos_set[chaos_recipe_slots[item.category2]]
@@ -0,0 +1,132 @@
+from src.ModsContainer import one_handed, two_handed
+
+# Keys of a chaos set, in the same order as sets created before the solver existed
+SET_SLOTS = ['weapon', 'ring', 'helmet', 'chest', 'gloves', 'boots', 'belt', 'amulet']
+SINGLE_SLOTS = ['helmet', 'chest', 'gloves', 'boots', 'belt', 'amulet']
+
+
+# Finds the maximum number of complete chaos recipe sets that can be made from given items.
+# Every set needs helmet, chest, gloves, boots, belt, amulet, two rings and a two-handed weapon or two one-handed
+# weapons/shields, and at least one of its items has to be a chaos item (ilvl 60-74), others can be regal (ilvl 75+).
+# Each slot is described by how many of its S units (item, ring pair or weapon combo) can contain a chaos item,
+# so checking if S sets can be made doesn't depend on the order of items and the best S is found with binary search.
+# With one_chaos_item=True every set has exactly one chaos item, which saves chaos items for next sets.
+class ChaosSetSolver:
+    def __init__(self, items_chaos: dict, items_regal: dict):
+        self.chaos = {slot: list(items_chaos.get(slot, [])) for slot in SET_SLOTS}
+        self.regal = {slot: list(items_regal.get(slot, [])) for slot in SET_SLOTS}
+        self.chaos_2h = [item for item in self.chaos['weapon'] if item.category2 in two_handed]
+        self.chaos_1h = [item for item in self.chaos['weapon'] if item.category2 in one_handed]
+        self.regal_2h = [item for item in self.regal['weapon'] if item.category2 in two_handed]
+        self.regal_1h = [item for item in self.regal['weapon'] if item.category2 in one_handed]
+
+    def solve(self, one_chaos_item: bool = False, max_sets: int = None) -> list:
+        low, high = 0, self._sets_upper_bound()
+        if max_sets is not None:
+            high = min(high, max_sets)
+        while low < high:
+            sets_count = (low + high + 1) // 2
+            if self._chaos_units(sets_count, one_chaos_item) is None:
+                high = sets_count - 1
+            else:
+                low = sets_count
+        if low == 0:
+            return []
+        return self._build_sets(low, self._chaos_units(low, one_chaos_item), one_chaos_item)
+
+    def _sets_upper_bound(self) -> int:
+        bound = min(len(self.chaos[slot]) + len(self.regal[slot]) for slot in SINGLE_SLOTS)
+        bound = min(bound, (len(self.chaos['ring']) + len(self.regal['ring'])) // 2)
+        weapon_units = len(self.chaos_2h) + len(self.regal_2h) + (len(self.chaos_1h) + len(self.regal_1h)) // 2
+        chaos_items = sum(len(self.chaos[slot]) for slot in SET_SLOTS)  # Every set needs at least one
+        return min(bound, weapon_units, chaos_items)
+
+    # Numbers of units with chaos item which each slot can provide when making sets_count sets
+    def _chaos_options(self, slot: str, sets_count: int, one_chaos_item: bool) -> list:
+        chaos, regal = len(self.chaos[slot]), len(self.regal[slot])
+        if slot in SINGLE_SLOTS:
+            return list(range(max(0, sets_count - regal), min(chaos, sets_count) + 1))
+        if slot == 'ring':
+            if chaos + regal < 2 * sets_count:
+                return []
+            if one_chaos_item:  # Ring pairs with one chaos ring
+                return list(range(max(0, 2 * sets_count - regal), min(chaos, sets_count) + 1))
+            return list(range((max(0, 2 * sets_count - regal) + 1) // 2, min(chaos, sets_count) + 1))
+        return [units for units in range(sets_count + 1) if self._weapon_plan(sets_count, units, one_chaos_item)]
+
+    # Returns numbers of weapon units (two-handed with chaos, one-handed pairs chaos+regal, chaos+chaos,
+    # two-handed regal, one-handed pairs regal+regal) or None if it's not possible
+    def _weapon_plan(self, sets_count: int, chaos_units: int, one_chaos_item: bool):
+        chaos_2h = min(len(self.chaos_2h), chaos_units)
+        chaos_pairs = chaos_units - chaos_2h
+        regal_2h = min(len(self.regal_2h), sets_count - chaos_units)
+        regal_pairs = sets_count - chaos_units - regal_2h
+        regal_1h_left = len(self.regal_1h) - 2 * regal_pairs
+        if regal_1h_left < 0:
+            return None
+        mixed_pairs = min(chaos_pairs, regal_1h_left)
+        if one_chaos_item and mixed_pairs < chaos_pairs:
+            return None
+        chaos_only_pairs = chaos_pairs - mixed_pairs
+        if mixed_pairs + 2 * chaos_only_pairs > len(self.chaos_1h):
+            return None
+        return chaos_2h, mixed_pairs, chaos_only_pairs, regal_2h, regal_pairs
+
+    # Returns {slot: units with chaos item} which makes sets_count sets, None if it's not possible.
+    # Each set needs exactly one unit with chaos item if one_chaos_item is set, at least one otherwise.
+    def _chaos_units(self, sets_count: int, one_chaos_item: bool):
+        options = {}
+        for slot in SET_SLOTS:
+            options[slot] = self._chaos_options(slot, sets_count, one_chaos_item)
+            if not options[slot]:
+                return None
+        chosen = {slot: 0 for slot in SET_SLOTS}  # index in options, smallest number of chaos items first
+        covered = sum(options[slot][0] for slot in SET_SLOTS)
+        if one_chaos_item and covered > sets_count:
+            return None
+        for slot in SET_SLOTS:
+            while covered < sets_count and chosen[slot] + 1 < len(options[slot]):
+                step = options[slot][chosen[slot] + 1] - options[slot][chosen[slot]]
+                if one_chaos_item and covered + step > sets_count:
+                    break
+                chosen[slot] += 1
+                covered += step
+        if covered < sets_count:
+            return None
+        return {slot: options[slot][chosen[slot]] for slot in SET_SLOTS}
+
+    def _build_sets(self, sets_count: int, chaos_units: dict, one_chaos_item: bool) -> list:
+        sets = [{slot: [] for slot in SET_SLOTS} for _ in range(sets_count)]
+        # Units with chaos items of each slot go to next sets, so every set gets at least one of them
+        offset = 0
+        for slot in SET_SLOTS:
+            units = self._slot_units(slot, sets_count, chaos_units[slot], one_chaos_item)
+            for index, unit in enumerate(units):
+                sets[(offset + index) % sets_count][slot] = unit
+            offset += chaos_units[slot]
+        return sets
+
+    # Returns sets_count units of a slot, the ones with chaos item first
+    def _slot_units(self, slot: str, sets_count: int, chaos_units: int, one_chaos_item: bool) -> list:
+        chaos, regal = self.chaos[slot], self.regal[slot]
+        if slot in SINGLE_SLOTS:
+            return [[item] for item in chaos[:chaos_units] + regal[:sets_count - chaos_units]]
+        if slot == 'ring':
+            chaos_rings = max(chaos_units, 2 * sets_count - len(regal))
+            if one_chaos_item:
+                chaos_rings = chaos_units
+            double_chaos = chaos_rings - chaos_units
+            chaos_iter, regal_iter = iter(chaos[:chaos_rings]), iter(regal)
+            units = [[next(chaos_iter), next(chaos_iter)] for _ in range(double_chaos)]
+            units += [[next(chaos_iter), next(regal_iter)] for _ in range(chaos_units - double_chaos)]
+            units += [[next(regal_iter), next(regal_iter)] for _ in range(sets_count - chaos_units)]
+            return units
+        chaos_2h, mixed_pairs, chaos_only_pairs, regal_2h, regal_pairs = \
+            self._weapon_plan(sets_count, chaos_units, one_chaos_item)
+        chaos_iter, regal_iter = iter(self.chaos_1h), iter(self.regal_1h)
+        units = [[item] for item in self.chaos_2h[:chaos_2h]]
+        units += [[next(chaos_iter), next(chaos_iter)] for _ in range(chaos_only_pairs)]
+        regal_pairs_units = [[next(regal_iter), next(regal_iter)] for _ in range(regal_pairs)]
+        units += [[next(chaos_iter), next(regal_iter)] for _ in range(mixed_pairs)]
+        units += [[item] for item in self.regal_2h[:regal_2h]]
+        return units + regal_pairs_units
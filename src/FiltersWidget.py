@@ -78,14 +78,16 @@ class FiltersWidget(DragWidget):
 
             category2 = list(cat1)  # bow, claw, helmet, ring...
             for cat2 in category2:
-                if cat2.tag == "mod":
-                    continue
+                if cat2.tag == "mod" or cat2.tag == "totals":
+                    continue  # Total mods can be edited only in the filter file
                 cat2_item = QStandardItem(cat2.tag)
                 cat2_item.setEditable(False)
                 cat1_item.appendRow(cat2_item)
                 mods2 = list(cat2)
                 if mods2:
                     for mod in mods2:
+                        if mod.tag == "totals":
+                            continue
                         cat2_item.appendRow(QStandardItem(mod.text))
                 cat2_item.appendRow(QStandardItem(DEFAULT_MOD_TEXT))
 
@@ -135,6 +137,7 @@ class FiltersWidget(DragWidget):
                 parent_dict[p] = {}
             parent_dict = parent_dict[p]
         parent_dict[ModsContainer.get_mod_key(mod)] = ModsContainer.get_mod_value(mod)
+        ModsContainer.filter_changed()
 
         # Save entry in mod filter file
         parent_xml = self.xml_root
@@ -158,6 +161,7 @@ class FiltersWidget(DragWidget):
         for p in parents:
             parent_dict = parent_dict[p]
         del parent_dict[ModsContainer.get_mod_key(mod)]
+        ModsContainer.filter_changed()
 
         for parent in parents:
             node = parent_xml.find(parent)
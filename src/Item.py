@@ -1,9 +1,9 @@
-from collections import defaultdict
-from src.ModsContainer import ModsContainer
+from types import MappingProxyType
 
 '''
-Class for storing item statistics and processing mod filters.
-calculate_mods method takes a dictionary as parameter, example:
+Class for storing item statistics. Matched mods are filled by ItemScorer.score() (or ScoringPool.score() with scoring
+processes), which takes mods required for item category from ModsContainer.get_thresholds(), created from filter
+loaded from file, example:
 filters = {
     'accessory': {
         'belt': {
@@ -38,58 +38,51 @@ self.mods_matched = {
 '''
 
 
+# Shared by all items which were never scored, e.g. in chaos recipe mode, read only so it can't be filled by mistake
+EMPTY_MODS = MappingProxyType({})
+
+
+# Stash can have hundreds of items and many stashes are requested at once, so items use __slots__
+# and mods_matched is allocated only when item is scored
 class Item:
+    __slots__ = ('x', 'y', 'height', 'width', 'ilvl', 'category1', 'category2', 'base', 'name', 'stash_name', 'score',
+                 'explicits', 'implicits', '_mods_matched', '_totals', 'geometry')
+
     def __init__(self):
         self.x = None
         self.y = None
         self.height = None
         self.width = None
         self.ilvl = None
-        self.category1 = None  # eg. weapons (constants.py)
-        self.category2 = None  # eg. onesword (constants.py)
+        self.category1 = None  # eg. weapons (constants.py), interned by BaseIndex
+        self.category2 = None  # eg. onesword (constants.py), interned by BaseIndex
         self.base = None  # item base name
         self.name = None
+        self.stash_name = None
         self.score = 0
-        self.explicits = []
-        self.implicits = []
-        self.totals = defaultdict(float)
-        self.mods_matched = defaultdict(float)
-        self.unsupported_mods = []
+        self.explicits = ()  # [(mod key, value)] from ModsContainer.normalize_mods
+        self.implicits = ()
+        self._mods_matched = None
+        self._totals = None
         self.geometry = None
 
-    def calculate_mods(self, filters: dict) -> None:
-        if not self.base:
-            print('Found item with not filled base, name: {}'.format(self.name))
-            return  # Not supported item base
-        if self.base.lower() not in filters.keys() and self.category1 not in filters.keys()\
-                and self.category2 not in filters.keys():
-            return
-        self.calculate_basic_explicits(filters)
-
-    def calculate_basic_explicits(self, filters: dict) -> None:
-        for explicit in self.explicits:
-            explicit = explicit.replace("'", "").replace("[", "").replace("]", "").replace("+", "").strip()
-            mod = ModsContainer.get_mod_key(explicit).lower()
-
-            expected_value = self.determine_expected_value(filters, mod)
-            if expected_value == 0:
-                continue
-
-            mod_value = ModsContainer.get_mod_value(explicit)
-
-            if 0 < expected_value <= float(mod_value):
-                self.mods_matched[mod] = float(mod_value)
+    @property
+    def mods_matched(self):
+        if self._mods_matched is None:
+            return EMPTY_MODS
+        return self._mods_matched
 
-    def determine_expected_value(self, filters: dict, mod: str) -> float:
-        expected_mods_cat1 = filters.get(self.category1)
-        expected_mods_cat2 = expected_mods_cat1.get(self.category2)
-        expected_value = 0.0
+    @mods_matched.setter
+    def mods_matched(self, mods_matched) -> None:
+        self._mods_matched = mods_matched
 
-        # Check if we are looking for this specific mod
-        # Filters are prioritized category2 > category1
-        if expected_mods_cat2 and expected_mods_cat2.get(mod):
-            expected_value = expected_mods_cat2.get(mod)
-        elif expected_mods_cat1 and expected_mods_cat1.get(mod):
-            expected_value = expected_mods_cat1.get(mod)
+    # Sums of mods which are parts of total mods from filter, {total mod key: value}
+    @property
+    def totals(self):
+        if self._totals is None:
+            return EMPTY_MODS
+        return self._totals
 
-        return expected_value
+    @totals.setter
+    def totals(self, totals) -> None:
+        self._totals = totals
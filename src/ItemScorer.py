@@ -0,0 +1,49 @@
+from collections import defaultdict
+from src.ModsContainer import ModsContainer
+
+
+# Scores all items of a run at once. Item.mods_matched and Item.totals are filled here or, for big scans with scoring
+# processes enabled, by ScoringPool.score() which gives the same results using match_mods() in worker processes.
+# Thresholds are fetched once per category and the loop avoids a method call per item, which is most of the cost
+# of scoring an item since thresholds became a single dict lookup per mod.
+class ItemScorer:
+    @staticmethod
+    def score(items: list) -> None:
+        category_filters = {}
+        for item in items:
+            if not item.base:
+                print('Found item with not filled base, name: {}'.format(item.name))
+                continue  # Not supported item base
+            category = (item.category1, item.category2)
+            if category not in category_filters:
+                category_filters[category] = ItemScorer.get_category_filter(category)
+            item.mods_matched, item.totals = ItemScorer.match_mods(item.explicits, *category_filters[category])
+
+    # Filter compiled for one category: (thresholds, totals), see ModsContainer.get_thresholds() and get_totals()
+    @staticmethod
+    def get_category_filter(category: tuple) -> tuple:
+        return ModsContainer.get_thresholds(*category), ModsContainer.get_totals(*category)
+
+    # Returns (matched mods, totals) for normalized mods of one item, None instead of empty containers.
+    # Doesn't use anything but its arguments, so it can also run in a worker process.
+    @staticmethod
+    def match_mods(explicits, thresholds: dict, totals: tuple) -> tuple:
+        if not thresholds and not totals:
+            return None, None
+        mods_matched = defaultdict(float)
+        for mod, mod_value in explicits:
+            expected_value = thresholds.get(mod)
+            if expected_value and 0 < expected_value <= mod_value:
+                mods_matched[mod] = float(mod_value)
+        if not totals:
+            return mods_matched, None
+
+        total_mods, expected_values = totals
+        item_totals = defaultdict(float)
+        for mod, mod_value in explicits:
+            for total in total_mods.get(mod, ()):
+                item_totals[total] += mod_value
+        for total, value in item_totals.items():
+            if 0 < expected_values[total] <= value:
+                mods_matched[total] = value
+        return mods_matched, item_totals or None
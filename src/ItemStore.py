@@ -0,0 +1,56 @@
+try:
+    import numpy
+except ModuleNotFoundError:
+    numpy = None  # Optional, Requester works on lists of items without it
+
+
+# Columnar copy of item fields in NumPy arrays. Row i describes items[i], so the result of any filter can be turned
+# back into Item objects. Columns are read only views, they can be passed around without copying.
+# Filling a column is a Python pass over all items, so only columns that are read are built.
+class ItemStore:
+    enabled = numpy is not None
+
+    def __init__(self, items: list):
+        self.items = items
+        count = len(items)
+        self.mods_count = numpy.fromiter((len(item.mods_matched) for item in items), numpy.int16, count)
+        self.stash_names = sorted({item.stash_name or '' for item in items})
+        stash_codes = {stash_name: code for code, stash_name in enumerate(self.stash_names)}
+        self.stash = numpy.fromiter((stash_codes[item.stash_name or ''] for item in items), numpy.int16, count)
+        for column in (self.mods_count, self.stash):
+            column.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def stash_mask(self, stash_name: str):
+        if stash_name not in self.stash_names:
+            return numpy.zeros(len(self), bool)
+        return self.stash == self.stash_names.index(stash_name)
+
+    # Indexes of at most count items with at least min_mods matched mods, most matched first. Only items tied with
+    # the last one taken are sorted with the best ones, equal items keep their order like with heapq.nlargest().
+    def top_indexes(self, count: int, min_mods: int = 1):
+        indexes = numpy.flatnonzero(self.mods_count >= min_mods)
+        counts = self.mods_count[indexes]
+        if count <= 0:
+            return indexes[:0]
+        if count < len(indexes):
+            kth = numpy.partition(counts, len(counts) - count)[len(counts) - count]
+            keep = counts >= kth
+            indexes, counts = indexes[keep], counts[keep]
+        return indexes[numpy.argsort(-counts, kind='stable')[:count]]
+
+    # Items drawn by PainterWidget in rare scanner mode: with at least min_mods matched mods, from the shown stash
+    # or without stash name (same as PainterWidget.is_in_shown_stash())
+    def drawable_mask(self, stash_name: str, min_mods: int):
+        mask = self.mods_count >= min_mods
+        if stash_name:
+            mask &= self.stash_mask(stash_name) | self.stash_mask('')
+        return mask
+
+    # Takes indexes or a boolean mask
+    def select(self, indexes) -> list:
+        if getattr(indexes, 'dtype', None) == bool:
+            indexes = numpy.flatnonzero(indexes)
+        return [self.items[index] for index in numpy.asarray(indexes).tolist()]
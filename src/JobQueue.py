@@ -0,0 +1,47 @@
+JOB_SCAN = "scan"  # Run button, requests stashes and draws frames
+JOB_COUNT = "count"  # Counting chaos recipe items to reload item filter, manual or after entering a map
+
+# Lower value is served first, user started scans are more important than filter refreshes
+job_priorities = {
+    JOB_SCAN: 0,
+    JOB_COUNT: 1
+}
+
+
+# Single entry point for all Requester work. Identical pending jobs are merged into one, pending jobs are served
+# by priority and a new job cancels the running one if it makes it outdated (same job) or is more important.
+# Jobs are started by callbacks provided for each job type, job_finished() has to be called when a job ends.
+class JobQueue:
+    def __init__(self, requester, job_starters: dict):
+        self.requester = requester
+        self.job_starters = job_starters  # job type -> function starting it
+        self.pending = []
+        self.current = None
+
+    def submit(self, job: str) -> None:
+        if job in self.pending:
+            return  # Same job is already waiting, it will serve this request too
+        if self.current == job:
+            # Running job would return data older than what was just requested
+            self.requester.cancel()
+        elif self.current and job_priorities[job] < job_priorities[self.current]:
+            # Less important job will be started again after this one
+            self.requester.cancel()
+            if self.current not in self.pending:
+                self.pending.append(self.current)
+        self.pending.append(job)
+        self._start_next()
+
+    def job_finished(self) -> None:
+        self.current = None
+        self._start_next()
+
+    def is_busy(self) -> bool:
+        return self.current is not None
+
+    def _start_next(self) -> None:
+        if self.current or not self.pending:
+            return
+        self.pending.sort(key=lambda pending_job: job_priorities[pending_job])
+        self.current = self.pending.pop(0)
+        self.job_starters[self.current]()
@@ -0,0 +1,69 @@
+import json
+import re
+
+ITEMS_ARRAY_START = re.compile(r'"items"\s*:\s*\[')
+decoder = json.JSONDecoder()
+
+
+# Parses "items" array of get-stash-items response while it is being downloaded. Iterating yields item dictionaries
+# one by one as soon as each of them is complete, so the whole response never needs to be kept in memory.
+# All other fields of the response (numTabs, error...) are available in "document" after iteration is finished.
+# Fields sent before the items array (numTabs, tabs...) can be checked by on_head before the first item is yielded.
+class JsonItemsStream:
+    def __init__(self, chunks, on_head=None):  # chunks - iterable of already decoded text
+        self.chunks = iter(chunks)
+        self.on_head = on_head
+        self.document = None
+        self.items_found = False  # False after iteration means the response had no items array
+
+    def _next_chunk(self) -> str:
+        return next(self.chunks, None)
+
+    def __iter__(self):
+        # Find beginning of the items array, everything before it is kept as a part of the document
+        buffer = ''
+        search_from = 0
+        while True:
+            match = ITEMS_ARRAY_START.search(buffer, search_from)
+            if match:
+                break
+            chunk = self._next_chunk()
+            if chunk is None:
+                # No items in the response, probably an error message
+                self.document = json.loads(buffer)
+                return
+            search_from = max(len(buffer) - 16, 0)
+            buffer += chunk
+        self.items_found = True
+        head = buffer[:match.end()]
+        buffer = buffer[match.end():]
+        if self.on_head:
+            self.on_head(json.loads(head + ']}'))
+
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer) and buffer[position] == ']':
+                break
+            try:
+                if position == len(buffer):
+                    raise ValueError('Need more data')
+                item, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                # Item is not complete yet, wait for more data
+                chunk = self._next_chunk()
+                if chunk is None:
+                    raise ValueError('Items data ended unexpectedly')
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield item
+
+        # Rest of the response is short, read all of it
+        tail = buffer[position:]
+        chunk = self._next_chunk()
+        while chunk is not None:
+            tail += chunk
+            chunk = self._next_chunk()
+        self.document = json.loads(head + tail)
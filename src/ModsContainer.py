@@ -1,7 +1,9 @@
 import os.path
 import platform
 import re
+import sys
 import xml.etree.ElementTree as ElementTree
+from functools import lru_cache
 
 if platform.system().lower() == 'windows':
     PROJECT_ROOT = "."  # os.path redirects to TEMP
@@ -11,33 +13,66 @@ else:
 FILTER_DIR = PROJECT_ROOT + "/filters/"
 DEFAULT_FILTER_PATH = FILTER_DIR + "mods.xml"
 CONFIG_PATH = PROJECT_ROOT + "/config.xml"
+STASH_CACHE_PATH = PROJECT_ROOT + "/stash_cache.xml"
+SNAPSHOT_DIR = PROJECT_ROOT + "/snapshots/"
+
+MOD_STRIP_TABLE = str.maketrans('', '', "'+")
+MOD_NUMBER_PATTERN = re.compile(r'(\d+(\.\d+)?)')
+MOD_FLOAT_PATTERN = re.compile(r'(\d+\.\d+)')
+MOD_INT_PATTERN = re.compile(r'(\d+)')
+MOD_CACHE_SIZE = 8192  # Parsed mod texts kept in memory, there are only a few hundred common ones
 
 
 class ModsContainer:
     mods = {}
+    thresholds = {}  # (category1, category2) -> {mod key: minimal value}, filled on first use
+    totals = {}  # (category1, category2) -> index of total mods from get_totals(), filled on first use
+    loaded_file = None  # (path, modification time, size) of loaded filter file
 
     @staticmethod
     def get_mod_key(mod_text: str) -> str:
-        return re.sub(r'(\d+(\.\d+)?)', 'x', mod_text)
+        return MOD_NUMBER_PATTERN.sub('x', mod_text)
 
     @staticmethod
     def get_mod_value(mod_text: str) -> float:
         # Find floats
-        mods = re.findall(r'(\d+\.\d+)', mod_text)
+        mods = MOD_FLOAT_PATTERN.findall(mod_text)
         value = 0
         if mods:
             value = sum(map(float, mods))/len(mods)
         else:
             # No floats, find ints
-            mods = re.findall(r'(\d+)', mod_text)
+            mods = MOD_INT_PATTERN.findall(mod_text)
             if mods:  # Just to be sure mod has any number, if it doesn't we can't process it
                 value = sum(map(float, mods)) / len(mods)
 
         return value
 
-    def process_totals(self, filter_dict: dict, cat: ElementTree.Element) -> None:
-        # Currently not used
-        # For each mod in item we would have to scan all total mods to check if it is a part of some total mod
+    # Turns mod text from API into canonical mod key and value used by filters, e.g.
+    # '+35 to maximum Life' -> ('x to maximum life', 35.0). Keys are interned, the same mods repeat on many items.
+    @staticmethod
+    def normalize_mod(mod_text: str) -> tuple:
+        return ModsContainer.parse_mod(mod_text.lower().translate(MOD_STRIP_TABLE).strip())
+
+    # Returns (mod key, value), the same mod texts are parsed again on every run, so results are cached
+    @staticmethod
+    @lru_cache(maxsize=MOD_CACHE_SIZE)
+    def parse_mod(mod_text: str) -> tuple:
+        return sys.intern(ModsContainer.get_mod_key(mod_text)), ModsContainer.get_mod_value(mod_text)
+
+    @staticmethod
+    def get_parse_stats() -> dict:
+        cache_info = ModsContainer.parse_mod.cache_info()
+        return {"hits": cache_info.hits, "misses": cache_info.misses, "size": cache_info.currsize,
+                "max_size": cache_info.maxsize}
+
+    @staticmethod
+    def normalize_mods(mod_texts: list) -> list:
+        return [ModsContainer.normalize_mod(mod_text) for mod_text in mod_texts]
+
+    @staticmethod
+    def process_totals(filter_dict: dict, cat: ElementTree.Element) -> None:
+        # Total (pseudo) mod is a sum of values of several mods, e.g. total elemental resistances.
         # Creates additional dictionary entry if 'totals' node exists.
         # Entry is a dictionary with mod text as key. Values are dictionaries with mod minimal value
         # and list of mods text that account for given total mod, e.g.:
@@ -53,18 +88,67 @@ class ModsContainer:
         #       }
         #   }
         # }
-        if cat.tag not in filter_dict:
-            filter_dict[cat.tag] = {}
+        # XML node of a total mod:
+        # <totals><total><value_text>50% to all elemental resistances</value_text><mod>x% to cold resistance</mod>
+        # <mod>x% to fire resistance</mod>...</total></totals>
         totals_cat = cat.find('totals')
-        if totals_cat:
-            totals_cat = list(totals_cat)
-            filter_dict[cat.tag]['totals'] = {self.get_mod_key(total.find('value_text').text): {
-                'value': self.get_mod_value(total.find('value_text').text),
-                'mods': [subtotal.text for subtotal in total.findall('mod')]}
-                for total in totals_cat}
+        if totals_cat is not None and len(totals_cat):
+            if cat.tag not in filter_dict:
+                filter_dict[cat.tag] = {}
+            totals = {}
+            for total in totals_cat:
+                total_key, total_value = ModsContainer.parse_mod(total.find('value_text').text)
+                totals[total_key] = {'value': total_value,
+                                     'mods': [ModsContainer.parse_mod(mod.text)[0] for mod in total.findall('mod')]}
+            filter_dict[cat.tag]['totals'] = totals
+
+    # Mods with minimal values which apply to items of given categories, category2 values override category1 ones.
+    # Scoring needs only one lookup per mod in the returned dictionary.
+    @staticmethod
+    def get_thresholds(category1: str, category2: str) -> dict:
+        key = (category1, category2)
+        if key not in ModsContainer.thresholds:
+            mods1 = ModsContainer.mods.get(category1) or {}
+            mods2 = mods1.get(category2) or {}
+            thresholds = {mod: value for mod, value in mods1.items() if not isinstance(value, dict) and value}
+            thresholds.update((mod, value) for mod, value in mods2.items() if not isinstance(value, dict) and value)
+            ModsContainer.thresholds[key] = thresholds
+        return ModsContainer.thresholds[key]
+
+    # Returns total mods which apply to items of given categories as ({mod key: [total mod keys]}, {total mod key:
+    # minimal value}), None if there are no totals. Mod key points to every total it is a part of, so an item needs
+    # only one pass over its mods to sum all totals.
+    @staticmethod
+    def get_totals(category1: str, category2: str):
+        key = (category1, category2)
+        if key not in ModsContainer.totals:
+            mods1 = ModsContainer.mods.get(category1) or {}
+            mods2 = mods1.get(category2) or {}
+            totals = dict(mods1.get('totals') or {})
+            totals.update(mods2.get('totals') or {})  # category2 totals override category1 ones
+            index = None
+            if totals:
+                total_mods = {}
+                for total, total_filter in totals.items():
+                    for mod in total_filter['mods']:
+                        total_mods.setdefault(mod, []).append(total)
+                index = (total_mods, {total: total_filter['value'] for total, total_filter in totals.items()})
+            ModsContainer.totals[key] = index
+        return ModsContainer.totals[key]
+
+    # Has to be called after ModsContainer.mods is modified
+    @staticmethod
+    def filter_changed() -> None:
+        ModsContainer.thresholds = {}
+        ModsContainer.totals = {}
 
+    # Filter file is parsed again only if it was modified since the last call
     @staticmethod
     def load_mods_config(xml_path: str) -> None:
+        file_stat = os.stat(xml_path)
+        loaded_file = (xml_path, file_stat.st_mtime, file_stat.st_size)
+        if loaded_file == ModsContainer.loaded_file:
+            return
         filter_dict = {}
         root = ElementTree.parse(xml_path).getroot()
         category1 = list(root)  # weapon, accessory, armour...
@@ -72,16 +156,14 @@ class ModsContainer:
             mods1 = cat1.findall('mod')
             if mods1:
                 mods1 = list(mods1)
-                filter_dict[cat1.tag] = {
-                    ModsContainer.get_mod_key(mod.text): ModsContainer.get_mod_value(mod.text) for mod in mods1
-                }
+                filter_dict[cat1.tag] = dict(ModsContainer.parse_mod(mod.text) for mod in mods1)
                 # Creates dictionary entry, e.g:
                 # filter_dict{
                 #   'x to dexterity': 30.0
                 #   ...
                 # }
 
-            # process_totals(filter_dict, cat1)
+            ModsContainer.process_totals(filter_dict, cat1)
 
             category2 = list(cat1)  # bow, claw, helmet, ring...
             for cat2 in category2:
@@ -91,12 +173,12 @@ class ModsContainer:
                 if mods2:
                     if cat1.tag not in filter_dict:
                         filter_dict[cat1.tag] = {}
-                    filter_dict[cat1.tag][cat2.tag] = {
-                        ModsContainer.get_mod_key(mod.text): ModsContainer.get_mod_value(mod.text)
-                        for mod in mods2 if mod.tag != 'totals'
-                    }
-                # process_totals(filter_dict, cat2)
+                    filter_dict[cat1.tag][cat2.tag] = dict(ModsContainer.parse_mod(mod.text)
+                                                           for mod in mods2 if mod.tag != 'totals')
+                    ModsContainer.process_totals(filter_dict[cat1.tag], cat2)
         ModsContainer.mods = filter_dict
+        ModsContainer.loaded_file = loaded_file
+        ModsContainer.filter_changed()
 
 
 # List of all item categories from https://pathofexile.fandom.com/wiki/Public_stash_tab_API under "category" section
@@ -353,6 +435,9 @@ item_bases = {
 one_handed = ['shield', 'claw', 'dagger', 'sceptre', 'wand', 'oneaxe', 'onemace', 'onesword']
 two_handed = ['bow', 'staff', 'twoaxe', 'twomace', 'twosword']
 items_categories = ['weapon', 'weapon', 'helmet', 'chest', 'gloves', 'boots', 'belt', 'amulet', 'ring', 'ring']
+# Chaos recipe slot of each category2 used in recipe
+chaos_recipe_slots = {category2: 'weapon' for category2 in one_handed + two_handed}
+chaos_recipe_slots.update({slot: slot for slot in ['helmet', 'chest', 'gloves', 'boots', 'belt', 'amulet', 'ring']})
 items_categories_filter = {
     'chest': "Body Armours",
     'helmet': "Helmets",
@@ -15,7 +15,7 @@ from PyQt5.QtWidgets import *
 from src.DragButton import DragButton
 from src.ResizeButton import ResizeButton
 from src.Item import Item
-from src.ModsContainer import PROJECT_ROOT, one_handed, two_handed
+from src.ModsContainer import PROJECT_ROOT
 
 
 stash_cells_root = {
@@ -76,6 +76,7 @@ class PainterWidget(QWidget):
         super(PainterWidget, self).__init__()
         self.image_path = PROJECT_ROOT + "/img/"
         self.stash_type = "quad"
+        self.stash_name = ""  # Stash shown in game, items from other stashes are not drawn
         self.colors = []
         self.stash_cells = stash_cells_root[self.stash_type]
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
@@ -133,12 +134,19 @@ class PainterWidget(QWidget):
 
         self.number_of_mods_to_draw = 1
         self.items = []
-        self.chaos_sets = []
+        self.item_store = None  # Columns of items when numpy is installed, set by Requester together with items
+        self.chaos_model = None  # Set by Requester, sets are kept in it between runs
         self.current_chaos_set = {}
         self.chaos_item = None
 
         self.mode = "chaos_recipe"
 
+    # Latest sets published by ChaosSetModel, the list and sets in it are never modified, so reading them doesn't
+    # need a lock while Requester thread updates the model
+    @property
+    def chaos_sets(self) -> list:
+        return self.chaos_model.sets if self.chaos_model else []
+
     def paintEvent(self, r: QPaintEvent) -> None:
         self.stash_cells = stash_cells_root[self.stash_type]
         if self.config_change_mode:
@@ -169,9 +177,17 @@ class PainterWidget(QWidget):
         elif self.mode == 'chaos_recipe' and len(self.chaos_sets) > 0:
             self.paint_chaos()
 
+    # Items from all stashes can be requested at once, draw only the ones from stash currently shown
+    def is_in_shown_stash(self, item: Item) -> bool:
+        return not item.stash_name or not self.stash_name or item.stash_name == self.stash_name
+
     def paint_rares(self) -> None:
-        for item in self.items:
-            if len(item.mods_matched) > 0:
+        items, item_store = self.items, self.item_store
+        if item_store is not None and item_store.items is items:
+            # Painter is refreshed all the time, masks on columns skip items that won't be drawn without a loop
+            items = item_store.select(item_store.drawable_mask(self.stash_name, max(self.number_of_mods_to_draw, 1)))
+        for item in items:
+            if len(item.mods_matched) > 0 and self.is_in_shown_stash(item):
                 self.qp.begin(self)
                 self.qp.setRenderHint(QPainter.Antialiasing)
                 pen = QPen(Qt.red)
@@ -189,10 +205,13 @@ class PainterWidget(QWidget):
                 self.qp.end()
 
     def paint_chaos(self) -> None:
-        if self.chaos_sets:
-            self.current_chaos_set = self.chaos_sets[-1]
+        chaos_sets = self.chaos_sets
+        if chaos_sets:
+            self.current_chaos_set = chaos_sets[-1]
             for item_array in self.current_chaos_set.values():
                 for item in item_array:
+                    if not self.is_in_shown_stash(item):
+                        continue
                     self.qp.begin(self)
                     self.qp.setRenderHint(QPainter.Antialiasing)
                     pen = QPen(Qt.red)
@@ -204,6 +223,26 @@ class PainterWidget(QWidget):
                     self.qp.end()
                     self.chaos_item = item
                     self.update()
+            self.paint_tab_indicator()
+
+    # Sets are made from items of all tabs, lists tabs with items of current set left in them when it's not only
+    # the shown one, shown tab is marked with ">"
+    def paint_tab_indicator(self) -> None:
+        if not self.chaos_model:
+            return
+        pick_list = self.chaos_model.pick_list(self.current_chaos_set)
+        if not pick_list or (len(pick_list) == 1 and self.is_in_shown_stash(pick_list[0][1][0])):
+            return
+        lines = ["{}{}: {}".format("> " if stash_name == self.stash_name else "", stash_name, len(items))
+                 for stash_name, items in pick_list]
+        self.qp.begin(self)
+        text_rect = self.qp.fontMetrics().boundingRect(QRect(0, 0, self.width(), self.height()),
+                                                       Qt.AlignLeft | Qt.AlignTop, "\n".join(lines))
+        text_rect.translate(pen_width * 2, pen_width * 2)
+        self.qp.fillRect(text_rect.adjusted(-pen_width, -pen_width, pen_width, pen_width), QColor(0, 0, 0, 160))
+        self.qp.setPen(QColor("Yellow"))
+        self.qp.drawText(text_rect, Qt.AlignLeft | Qt.AlignTop, "\n".join(lines))
+        self.qp.end()
 
     def paint_items(self) -> None:
         if self.mode == "rare_scanner":
@@ -253,16 +292,13 @@ class PainterWidget(QWidget):
     def process_mouse_click(self, ox, oy) -> None:
         for chaos_item_list in self.current_chaos_set.values():
             for chaos_item in chaos_item_list:
-                if chaos_item:
+                if chaos_item and chaos_item.geometry and self.is_in_shown_stash(chaos_item):
                     if chaos_item.geometry.x() <= ox <= chaos_item.geometry.x() + chaos_item.geometry.width() \
                             and chaos_item.geometry.y() <= oy <= chaos_item.geometry.y() \
                             + chaos_item.geometry.height():
-                        category = chaos_item.category2
-                        if category in one_handed + two_handed:
-                            category = "weapon"
-                        self.current_chaos_set[category].remove(chaos_item)
-                        if not any(x for x in self.current_chaos_set.values()):
-                            self.chaos_sets.pop()
-                            if self.chaos_sets:
-                                self.current_chaos_set = self.chaos_sets[-1]
+                        self.chaos_model.collect_item(chaos_item)
+                        chaos_sets = self.chaos_sets
+                        if chaos_sets:
+                            self.current_chaos_set = chaos_sets[-1]
                         self.paint_chaos()
+                        return
@@ -0,0 +1,114 @@
+import time
+from collections import deque
+from threading import Lock
+
+SAFETY_MARGIN = 1  # Number of hits left unused in every rule, other tools may share our limits
+
+
+# Single limit from GGG headers, e.g. "45:60:120" - 45 hits allowed in 60 seconds, 120 seconds penalty if exceeded.
+# Every hit we make is stored as a timestamp, so number of tokens left is hits minus timestamps inside the period.
+class RateLimitRule:
+    def __init__(self, hits: int, period: int, penalty: int):
+        self.hits = hits
+        self.period = period
+        self.penalty = penalty
+        self.timestamps = deque()
+
+    def allowed_hits(self) -> int:
+        return max(self.hits - SAFETY_MARGIN, 1)
+
+    def _expire(self, now: float) -> None:
+        while self.timestamps and now - self.timestamps[0] >= self.period:
+            self.timestamps.popleft()
+
+    def remaining(self, now: float) -> int:
+        self._expire(now)
+        return max(self.allowed_hits() - len(self.timestamps), 0)
+
+    def wait_time(self, now: float) -> float:
+        if self.remaining(now) > 0:
+            return 0.0
+        # Wait until enough of the oldest hits leave the period to get one token back
+        index = len(self.timestamps) - self.allowed_hits()
+        return max(self.timestamps[index] + self.period - now, 0.0)
+
+    def sync(self, hits_used: int, now: float) -> None:
+        # Server counts also hits we didn't send (e.g. from browser), add them as if they were sent just now
+        self._expire(now)
+        while len(self.timestamps) < hits_used:
+            self.timestamps.append(now)
+
+
+# Paces requests to GGG API, learns limits from X-Rate-Limit-* and Retry-After headers of each response.
+# Every request has to call acquire() before being sent and update() with headers of the response.
+class RateLimiter:
+    def __init__(self):
+        self.lock = Lock()
+        self.rules = {}  # (rule name, period) -> RateLimitRule
+        self.blocked_until = 0.0
+
+    def acquire(self, max_wait: float = None) -> None:
+        while True:
+            with self.lock:
+                now = time.time()
+                wait = self._wait_time(now)
+                if wait <= 0:
+                    for rule in self.rules.values():
+                        rule.timestamps.append(now)
+                    return
+            if max_wait is not None and wait > max_wait:
+                raise ValueError('Request limit reached, try again in {} seconds'.format(int(wait) + 1))
+            time.sleep(wait)
+
+    def update(self, headers: dict) -> None:
+        with self.lock:
+            now = time.time()
+            rule_names = headers.get('X-Rate-Limit-Rules')
+            if rule_names:
+                for rule_name in rule_names.split(','):
+                    self._update_rule(rule_name.strip(), headers, now)
+            retry_after = headers.get('Retry-After')
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + float(retry_after))
+
+    def _update_rule(self, rule_name: str, headers: dict, now: float) -> None:
+        policy = headers.get('X-Rate-Limit-' + rule_name)
+        if not policy:
+            return
+        state = headers.get('X-Rate-Limit-' + rule_name + '-State', '')
+        states = {}
+        for limit_state in state.split(','):
+            if limit_state:
+                hits_used, period, restricted = map(int, limit_state.split(':'))
+                states[period] = (hits_used, restricted)
+
+        for limit in policy.split(','):
+            hits, period, penalty = map(int, limit.split(':'))
+            rule = self.rules.setdefault((rule_name, period), RateLimitRule(hits, period, penalty))
+            rule.hits = hits  # Policy can change at any time, keep our hits history anyway
+            rule.penalty = penalty
+            if period in states:
+                hits_used, restricted = states[period]
+                rule.sync(hits_used, now)
+                if restricted:
+                    self.blocked_until = max(self.blocked_until, now + restricted)
+
+    def _wait_time(self, now: float) -> float:
+        wait = max(self.blocked_until - now, 0.0)
+        for rule in self.rules.values():
+            wait = max(wait, rule.wait_time(now))
+        return wait
+
+    def wait_time(self) -> float:
+        with self.lock:
+            return self._wait_time(time.time())
+
+    def remaining(self) -> int:
+        # Number of requests that can be sent right now without waiting, None if limits are not known yet
+        with self.lock:
+            now = time.time()
+            if self.blocked_until > now:
+                return 0
+            if not self.rules:
+                return None
+            return min(rule.remaining(now) for rule in self.rules.values())
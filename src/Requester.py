@@ -1,27 +1,68 @@
 import requests
 import copy
-from collections import OrderedDict
+import heapq
+from functools import partial
+from threading import Lock
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtCore import *
-from src.ModsContainer import item_bases, ModsContainer, items_categories, one_handed, two_handed
+from src.ModsContainer import ModsContainer, chaos_recipe_slots
+from src.BaseIndex import base_index
+from src.ItemScorer import ItemScorer
+from src.ItemStore import ItemStore
+from src.ScoringPool import ScoringPool
+from src.ChaosSetModel import ChaosSetModel
 from src.Item import Item
+from src.StashIndexCache import StashIndexCache
+from src.RateLimiter import RateLimiter
+from src.StashSnapshots import StashSnapshots
+from src.JsonItemsStream import JsonItemsStream
+from src.JobQueue import JOB_SCAN, JOB_COUNT
 from src.SettingsWidget import SettingsWidget
 from src.PainterWidget import PainterWidget
 
 VERSION = "2.0"
+MAX_STASH_REQUEST_WORKERS = 6
+MAX_RATE_LIMIT_WAIT = 10  # seconds, if we would need to wait longer for the request it fails instead
+RESPONSE_CHUNK_SIZE = 64 * 1024
+REQUEST_TIMEOUT = 20  # seconds without any data from the server
+# Slots of chaos counters sent by finished_counting_chaos, filter sections are generated in this order
+COUNTER_SLOTS = ["weapon", "helmet", "chest", "gloves", "boots", "belt", "amulet", "ring"]
+
+
+# Raised when stash indexes taken from cache no longer match stashes on the account
+class StashLayoutChanged(Exception):
+    pass
+
+
+# Raised inside a running job after cancel() was called, the job ends without emitting its results
+class RequestCancelled(Exception):
+    pass
 
 
 # Handles requesting GGG API for stash and items data
 class Requester(QThread):
     finished = pyqtSignal()
     failed = pyqtSignal(Exception)
+    cancelled = pyqtSignal()
     finished_counting_chaos = pyqtSignal(object)
 
     def __init__(self, settings_widget: SettingsWidget, painter_widget: PainterWidget):
         super(Requester, self).__init__()
-        self._items_data = []
         self.items = []
+        self.item_store = None  # Columns of rare scanner results when numpy is installed
         self.stashes = {}
+        self.stash_index_cache = StashIndexCache()
+        self.num_tabs = 0
+        self.stashes_from_cache = False
         self.session = None
+        self.rate_limiter = RateLimiter()
+        self.snapshots = StashSnapshots()
+        self.force_offline = False  # Set to use saved stashes only for the next run, e.g. on program start
+        self.cancel_requested = False
+        self.job = JOB_SCAN  # What run() does, set before the thread is started
+        self.session_adapter = None
+        self.session_owner_id = None  # Session ID used in cookie of current session
         self.settings_widget = settings_widget
         self.mods_filter = ModsContainer.mods
         self.mode = "chaos_recipe"
@@ -33,26 +74,48 @@ class Requester(QThread):
         # We need to send new item data to the painter after we finish working on it
         self.painter_widget = painter_widget
 
-        self.chaos_sets = []
+        # Items from previous run, used to process only items that changed, {item id: (fingerprint, Item)}
+        self._item_cache = {}
+        self._item_cache_key = None
+        self._scored_filter = None
+        self._rescore_all = False
+        self._current_items = {}
+        self._items_to_score = []
+        self.scoring_pool = None
+        self._processing_lock = Lock()  # Items from many stashes can be processed at the same time
+        self.last_diff = {"added": [], "removed": [], "moved": [], "changed": []}
+        self.unknown_bases = set()  # Reported once per program run
+
+        self.chaos_counters = {slot: [0, 0] for slot in COUNTER_SLOTS}
+        self.chaos_model = ChaosSetModel()
+        self.chaos_sets = self.chaos_model.sets
         self.allow_identified = False
         self.fill_greedy = True
         self.chaos_sets_goal = 0
 
     def run(self) -> None:
+        if self.job == JOB_COUNT:
+            self.count_chaos_items()
+            return
+        self.cancel_requested = False
         self.clear()
         self._reload_settings(self.settings_widget.get_settings_for_requester())
+        if self.force_offline:
+            self.offline_mode = True
+            self.force_offline = False
         self.mods_filter = ModsContainer.mods  # Refresh values, they could be modified
         try:
-            self.chaos_sets = []
             self.request_data()
-            self.process_items_data()
             if self.mode == "rare_scanner":
                 self.calculate_items_mods()
                 self.painter_widget.items = self.items
+                self.painter_widget.item_store = self.item_store
                 # self.debug_print_matches()
             else:
                 self.create_chaos_sets()
-                self.painter_widget.chaos_sets = self.chaos_sets
+                self.painter_widget.chaos_model = self.chaos_model
+        except RequestCancelled:
+            self.cancelled.emit()
         except Exception as e:
             self.failed.emit(e)
         else:
@@ -60,44 +123,82 @@ class Requester(QThread):
 
     def count_chaos_items(self):
         if self.mode == "chaos_recipe":
+            self.cancel_requested = False
             self.clear()
             self._reload_settings(self.settings_widget.get_settings_for_requester())
             try:
-                chaos_counters = {"weapon": [0, 0], "helmet": [0, 0], "chest": [0, 0], "gloves": [0, 0],
-                                  "boots": [0, 0], "belt": [0, 0], "amulet": [0, 0], "ring": [0, 0]}
-                self.request_data()
-                self.process_items_data()
-                items_regal, items_chaos = self.split_items_to_dicts()
-                for category in chaos_counters:
-                    if category in items_chaos:
-                        chaos_counters[category][0] = len(items_chaos[category])
-                    if category in items_regal:
-                        chaos_counters[category][1] = len(items_regal[category])
+                self.request_data(counting=True)
+            except RequestCancelled:
+                self.cancelled.emit()
             except Exception as e:
                 self.failed.emit(e)
             else:
-                self.finished_counting_chaos.emit(chaos_counters)
+                self.finished_counting_chaos.emit(self.chaos_counters)
+        else:
+            self.cancelled.emit()  # Nothing to count in rare scanner mode
+
+    # Counting path of request_data(), updates chaos_counters straight from item data without creating Items.
+    # Reads only fields that decide if item is counted (same rules as process_item_data() and split_items_to_dicts())
+    # and its base for the slot, item cache is not touched so the next scan still compares with the previous scan.
+    def count_items_data(self, items_data, stash_name: str) -> None:
+        counters = {slot: [0, 0] for slot in COUNTER_SLOTS}
+        for item_data in items_data:
+            self._check_cancelled()
+            if item_data['frameType'] != 2 or item_data['ilvl'] < 60 or len(item_data.get('sockets', ())) >= 6:
+                continue
+            if item_data['identified'] and not self.allow_identified:
+                continue
+            found = base_index.resolve(str(item_data['typeLine']), item_data.get('baseType'))
+            slot = chaos_recipe_slots.get(found[1]) if found else None
+            if slot:
+                counters[slot][0 if item_data['ilvl'] <= 74 else 1] += 1
+        with self._processing_lock:
+            for slot, (chaos, regal) in counters.items():
+                self.chaos_counters[slot][0] += chaos
+                self.chaos_counters[slot][1] += regal
+
+    # Called on program exit when no job is running
+    def shutdown(self) -> None:
+        if self.scoring_pool:
+            self.scoring_pool.shutdown()
+            self.scoring_pool = None
+        if self.session:
+            self.session.close()
+            self.session = None
+
+    # Can be called from any thread, running job stops at the next item or request
+    def cancel(self) -> None:
+        self.cancel_requested = True
+
+    def _check_cancelled(self) -> None:
+        if self.cancel_requested:
+            raise RequestCancelled()
 
     def clear(self) -> None:
         self.stashes.clear()
         self.items.clear()
-        self._items_data.clear()
 
     def _validate_data_exists(self) -> None:
-        if not self.session_id:
+        if not self.session_id and not self.offline_mode:
             raise ValueError('Session ID setting is empty')
         if not self.account_name:
             raise ValueError('Account name setting is empty')
         if not self.league:
             raise ValueError('League setting is empty')
-        if not self.stash_name:
+        if not self._stash_names_to_request():
             raise ValueError('Stash name setting is empty')
 
     def _reload_settings(self, d: dict) -> None:
         self.account_name = d["account_name"]
         self.session_id = d["session_id"]
         self.stash_name = d["stash_name"]
+        self.stash_names = d["stash_names"]
+        self.fetch_all_stashes = d["fetch_all_stashes"]
+        self.offline_mode = d["offline_mode"]
+        self.snapshot_max_age = d["snapshot_max_age"]
         self.league = d["league"]
+        self.api_url = d["api_url"]
+        self.scoring_processes = d["scoring_processes"]
         ModsContainer.load_mods_config(d["mod_file"])
         self.mode = d["mode"]
         self.allow_identified = d["allow_identified"]
@@ -105,7 +206,7 @@ class Requester(QThread):
 
     def debug_print_matches(self, num_of_matches=1) -> None:
         print("Item base - Mods - Item name")
-        for item in self.items:
+        for item in self.top_items(len(self.items), num_of_matches):
             if len(item.mods_matched) >= num_of_matches:
                 out_string = item.base + " "
                 # Replace all x characters with mod value, at the end strip zeros
@@ -117,10 +218,10 @@ class Requester(QThread):
                 print(out_string)
 
     def get_stash_names(self) -> None:
-        request_string = 'https://www.pathofexile.com/character-window/get-stash-items?league=' + self.league + \
+        request_string = self.api_url + '?league=' + self.league + \
                          '&tabIndex=0&accountName=' + self.account_name + '&tabs=1'
 
-        response_json = self.session.get(request_string)
+        response_json = self._get(request_string)
         if response_json.status_code < 200 or response_json.status_code > 299:
             raise ValueError("Stash request failed with code ", response_json.status_code)
         else:
@@ -135,208 +236,337 @@ class Requester(QThread):
                 index = tab['i']
                 if name not in self.stashes:
                     self.stashes[name] = index
+        self.num_tabs = response_json.get('numTabs', len(tabs))
+        self.stashes_from_cache = False
+        self.stash_index_cache.update(self.account_name, self.league, self.stashes, self.num_tabs)
 
-    def request_data(self) -> None:
-        self._validate_data_exists()
-        self.session = requests.Session()
-        self.session.headers = {'Cookie': 'POESESSID=' + self.session_id,
-                                'User-Agent': 'github.com/Essyer/PoETiS v' + VERSION + ' poetis.tool@gmail.com'}
+    # Stash list is requested only if cache is empty, too old or it doesn't know some of requested stashes
+    def _resolve_stash_indexes(self, stash_names: list) -> None:
+        cached = self.stash_index_cache.get(self.account_name, self.league)
+        if cached and all(stash_name in cached["stashes"] for stash_name in stash_names):
+            self.stashes.update(cached["stashes"])
+            self.num_tabs = cached["num_tabs"]
+            self.stashes_from_cache = True
+            return
         self.get_stash_names()
-        if self.stash_name not in self.stashes:
-            raise ValueError('Stash ' + self.stash_name + ' not found')
-        stash_index = str(self.stashes[self.stash_name])
-        request_string = 'https://www.pathofexile.com/character-window/get-stash-items?league=' + self.league + \
-                         '&tabIndex=' + stash_index + '&tabs=0&accountName=' + self.account_name
+        for stash_name in stash_names:
+            if stash_name not in self.stashes:
+                raise ValueError('Stash ' + stash_name + ' not found')
+
+    # Session lives as long as Requester so connections to GGG servers are kept alive between runs.
+    # It is rebuilt only if session ID changes.
+    def _prepare_session(self) -> None:
+        if self.session and self.session_owner_id == self.session_id:
+            return
+        if self.session:
+            self.session.close()
+        self.session = requests.Session()
+        # Pool has to be big enough to keep a connection for every stash requested at the same time
+        self.session_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_STASH_REQUEST_WORKERS)
+        self.session.mount('https://', self.session_adapter)
+        self.session.mount('http://', self.session_adapter)
+        self.session.headers.update({'Cookie': 'POESESSID=' + self.session_id,
+                                     'User-Agent': 'github.com/Essyer/PoETiS v' + VERSION + ' poetis.tool@gmail.com',
+                                     'Accept-Encoding': 'gzip, deflate',
+                                     'Connection': 'keep-alive'})
+        self.session_owner_id = self.session_id
+
+    # Number of requests sent with current session and how many of them reused already opened connection
+    def get_connection_stats(self) -> dict:
+        stats = {"requests": 0, "connections": 0, "reused": 0}
+        if self.session_adapter:
+            pools = self.session_adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                stats["requests"] += pool.num_requests
+                stats["connections"] += pool.num_connections
+        stats["reused"] = stats["requests"] - stats["connections"]
+        return stats
+
+    # All requests to GGG API have to go through here to respect rate limits sent by the server
+    def _get(self, request_string: str, stream=False) -> requests.Response:
+        response = None
+        for attempt in range(2):
+            self._check_cancelled()
+            self.rate_limiter.acquire(MAX_RATE_LIMIT_WAIT)
+            response = self.session.get(request_string, stream=stream, timeout=REQUEST_TIMEOUT)
+            self.rate_limiter.update(response.headers)
+            if response.status_code != 429:
+                break
+            response.close()
+        return response
+
+    def get_rate_limit_state(self) -> dict:
+        return {"remaining": self.rate_limiter.remaining(), "wait": self.rate_limiter.wait_time()}
+
+    # Chaos recipe pools items from every configured tab, so sets can be made from items spread over many tabs
+    def _stash_names_to_request(self) -> list:
+        if self.fetch_all_stashes or (self.mode == "chaos_recipe" and self.stash_names):
+            return self.stash_names
+        return [self.stash_name] if self.stash_name else []
+
+    # Requests items of configured stashes, items are processed while the response is still being downloaded
+    # With counting=True items are only counted for chaos recipe filter, see count_items_data()
+    def request_data(self, counting: bool = False) -> None:
+        self._validate_data_exists()
+        stash_names = self._stash_names_to_request()
+        process = self.count_items_data if counting else self.process_items_data
+        for attempt in range(2):
+            if counting:
+                self.chaos_counters = {slot: [0, 0] for slot in COUNTER_SLOTS}
+            else:
+                self._begin_processing()
+            stashes_to_request = self._load_snapshots(stash_names, process)
+            if not stashes_to_request:
+                break
+            self._prepare_session()
+            self._resolve_stash_indexes(stashes_to_request)
+            try:
+                self._request_stashes_items(stashes_to_request, process)
+                break
+            except StashLayoutChanged:
+                # Stashes were added, removed or moved since we cached their indexes, ask for new list and start over
+                self.stashes.clear()
+                self.stash_index_cache.invalidate(self.account_name, self.league)
+        if not counting:
+            self._finish_processing()
+
+    # Processes saved stashes if they are fresh enough (or any saved stash in offline mode),
+    # returns names of stashes that still need to be requested
+    def _load_snapshots(self, stash_names: list, process) -> list:
+        if not self.offline_mode and not self.snapshot_max_age:
+            return stash_names
+        max_age = None if self.offline_mode else self.snapshot_max_age
+        stashes_to_request = []
+        for stash_name in stash_names:
+            self._check_cancelled()
+            chunks = self.snapshots.read_chunks(self.account_name, self.league, stash_name, max_age)
+            if chunks is None:
+                if self.offline_mode:
+                    raise ValueError('Stash ' + stash_name + ' was never requested, offline mode is not possible')
+                stashes_to_request.append(stash_name)
+                continue
+            process(JsonItemsStream(chunks), stash_name)
+        return stashes_to_request
+
+    def has_snapshots(self) -> bool:
+        stash_names = self._stash_names_to_request()
+        return bool(stash_names) and all(stash_name and self.snapshots.exists(self.account_name, self.league, stash_name)
+                                         for stash_name in stash_names)
+
+    def _request_stashes_items(self, stash_names: list, process) -> None:
+        if len(stash_names) == 1:
+            self.request_stash_items(stash_names[0], process)
+            return
+        # Every stash is a separate request, send them at the same time sharing one session
+        with ThreadPoolExecutor(max_workers=min(len(stash_names), MAX_STASH_REQUEST_WORKERS)) as executor:
+            for _ in executor.map(self.request_stash_items, stash_names, [process] * len(stash_names)):
+                pass  # Collect exceptions from workers
+
+    def request_stash_items(self, stash_name: str, process) -> None:
+        stash_index = str(self.stashes[stash_name])
+        # Cached index is checked against tab list sent with the items, it costs no extra request
+        tabs = '1' if self.stashes_from_cache else '0'
+        request_string = self.api_url + '?league=' + self.league + \
+                         '&tabIndex=' + stash_index + '&tabs=' + tabs + '&accountName=' + self.account_name
+        response = self._get(request_string, stream=True)
+        response.encoding = response.encoding or 'utf-8'
+        check_layout = partial(self._check_stash_layout, response, stash_name)
         try:
-            response_json = self.session.get(request_string).json()
-        except ValueError:
-            raise ValueError('Invalid session id')
-        for item in response_json['items']:
-            self._items_data.append(item)
-
-    def process_items_data(self) -> None:
-        for item_data in self._items_data:
-            item = Item()
-            if self.mode == "rare_scanner":
-                if 'explicitMods' in item_data and \
-                        ((item_data['frameType'] == 1 and self.mode == "rare_scanner")  # magic item
-                         or item_data['frameType'] == 2):  # rare item
-                    #  copy item information and mods
-                    self.copy_info(item_data, item)
+            with self.snapshots.writer(self.account_name, self.league, stash_name) as snapshot:
+                items_stream = JsonItemsStream(self._save_chunks(
+                    response.iter_content(RESPONSE_CHUNK_SIZE, decode_unicode=True), snapshot), check_layout)
+                try:
+                    process(items_stream, stash_name)
+                except ValueError:
+                    if items_stream.items_found:
+                        raise  # Response was cut off, e.g. connection dropped while downloading
+                    raise ValueError('Invalid session id')  # Not JSON at all, GGG sends login page
+                response_json = items_stream.document
+                check_layout(response_json)  # Error responses have no items, tab list may come after them
+                if 'error' in response_json:
+                    raise ValueError('No connection or invalid settings')
+                snapshot.commit()
+        finally:
+            response.close()
+
+    def _check_stash_layout(self, response: requests.Response, stash_name: str, response_json: dict) -> None:
+        if self._stash_layout_changed(response, response_json, stash_name):
+            raise StashLayoutChanged()
+
+    # Only a successful response can tell that cached stash indexes are outdated. Rate limit, server errors
+    # or expired session say nothing about stash layout and must not throw away the cache.
+    # Moving or renaming tabs keeps numTabs, so the tab at cached index has to have the requested name.
+    def _stash_layout_changed(self, response: requests.Response, response_json: dict, stash_name: str) -> bool:
+        if not self.stashes_from_cache or not 200 <= response.status_code < 300:
+            return False
+        error = response_json.get('error')
+        if error:
+            message = error.get('message', '') if isinstance(error, dict) else str(error)
+            return message.lower() == 'resource not found'
+        if 'tabs' in response_json:
+            index = self.stashes[stash_name]
+            return not any(tab.get('i') == index and tab.get('n') == stash_name for tab in response_json['tabs'])
+        return response_json.get('numTabs', self.num_tabs) != self.num_tabs
+
+    @staticmethod
+    def _save_chunks(chunks, snapshot):
+        for chunk in chunks:
+            snapshot.write(chunk)
+            yield chunk
+
+    def _begin_processing(self) -> None:
+        cache_key = (self.mode, self.allow_identified)
+        if cache_key != self._item_cache_key:
+            self._item_cache.clear()
+            self._item_cache_key = cache_key
+        # Unchanged items keep their matched mods unless the filter was modified since they were calculated
+        self._rescore_all = self.mods_filter != self._scored_filter
+        self._current_items = {}
+        self._items_to_score = []
+        self.items = []
+        self.last_diff = {"added": [], "removed": [], "moved": [], "changed": []}
+
+    def _finish_processing(self) -> None:
+        previous_items = self._item_cache
+        self.last_diff["removed"] = [item_id for item_id in previous_items if item_id not in self._current_items]
+        self._item_cache = self._current_items
+        self._current_items = {}
+        if self.mode == "rare_scanner":
+            self._score_items(self._items_to_score)
+            self._items_to_score = []
+            self._scored_filter = copy.deepcopy(self.mods_filter)
+
+    def _score_items(self, items: list) -> None:
+        if self.scoring_processes < 2:
+            ItemScorer.score(items)
+            return
+        if self.scoring_pool and self.scoring_pool.processes != self.scoring_processes:
+            self.scoring_pool.shutdown()
+            self.scoring_pool = None
+        if not self.scoring_pool:
+            self.scoring_pool = ScoringPool(self.scoring_processes)
+        self.scoring_pool.score(items)
+
+    # Compares new items with the ones from previous run by item id. Items that didn't change are reused together
+    # with their categories and matched mods, only new and modified items are processed again.
+    # In rare scanner mode new, changed and (after filter modification) reused items are scored together at the end.
+    def process_items_data(self, items_data, stash_name: str) -> None:
+        previous_items = self._item_cache
+        for item_data in items_data:
+            self._check_cancelled()
+            with self._processing_lock:
+                item_id = item_data.get('id')
+                fingerprint = self._item_fingerprint(item_data)
+                cached = previous_items.get(item_id)
+                if cached and cached[0] == fingerprint:
+                    item = cached[1]
+                    if item and (item.x != item_data['x'] or item.y != item_data['y'] or item.stash_name != stash_name):
+                        item.x = item_data['x']
+                        item.y = item_data['y']
+                        item.stash_name = stash_name
+                        self.last_diff["moved"].append(item_id)
+                    if item and self._rescore_all and self.mode == "rare_scanner":
+                        self._items_to_score.append(item)
+                else:
+                    # Currency used on item doesn't change its id, such item is processed as a new one
+                    self.last_diff["changed" if cached else "added"].append(item_id)
+                    item = self.process_item_data(item_data, stash_name)
+                    if item and self.mode == "rare_scanner":
+                        self._items_to_score.append(item)
+                if item_id:
+                    self._current_items[item_id] = (fingerprint, item)
+                if item:
+                    self.items.append(item)
+
+    @staticmethod
+    def _item_fingerprint(item_data: dict) -> tuple:
+        return (item_data.get('typeLine'), item_data.get('identified'), item_data.get('ilvl'),
+                tuple(item_data.get('explicitMods', ())), len(item_data.get('sockets', ())))
+
+    # Returns Item if we need it on our list of items, None otherwise
+    def process_item_data(self, item_data: dict, stash_name: str) -> Item:
+        item = Item()
+        if self.mode == "rare_scanner":
+            if 'explicitMods' in item_data and \
+                    ((item_data['frameType'] == 1 and self.mode == "rare_scanner")  # magic item
+                     or item_data['frameType'] == 2):  # rare item
+                #  copy item information and mods
+                self.copy_info(item_data, item, stash_name)
+                # determine item base and decide if we need it on our list of items
+                if self.determine_categories(item_data, item):
+                    return item
+                elif 'map' not in item_data['baseType'].lower() and item_data['baseType'] not in self.unknown_bases:
+                    self.unknown_bases.add(item_data['baseType'])
+                    print('Found item with unknown base, baseType: {}'.format(item_data['baseType']))
+        else:
+            if item_data['frameType'] == 2 and ('sockets' not in item_data or len(item_data['sockets']) < 6):  # rare item, not 6-sockets
+                if not item_data['identified'] or self.allow_identified:
+                    #  copy item information
+                    self.copy_info(item_data, item, stash_name)
                     # determine item base and decide if we need it on our list of items
                     self.determine_categories(item_data, item)
-                    if item.base:
-                        self.items.append(item)
-                    elif 'map' not in item_data['baseType'].lower():
-                        print('Found item with not filled base, baseType: {}'.format(item_data['baseType']))
-            else:
-                if item_data['frameType'] == 2 and ('sockets' not in item_data or len(item_data['sockets']) < 6):  # rare item, not 6-sockets
-                    if not item_data['identified'] or self.allow_identified:
-                        #  copy item information
-                        self.copy_info(item_data, item)
-                        # determine item base and decide if we need it on our list of items
-                        self.determine_categories(item_data, item)
-                        self.items.append(item)
+                    return item
+        return None
 
+    # Items are already scored while processing. Items without matched mods can't be drawn (slider minimum is 1),
+    # the rest is kept in stash order, so moving the slider doesn't need a new run. top_items() returns the best ones.
     def calculate_items_mods(self) -> None:
-        for item in self.items:
-            item.calculate_mods(self.mods_filter)
-        self.items = sorted(self.items, key=lambda i: len(i.mods_matched), reverse=True)
+        self.items = [item for item in self.items if item.mods_matched]
+        self.item_store = ItemStore(self.items) if ItemStore.enabled else None
+
+    # Returns at most count items with at least min_mods matched mods, most matched first
+    def top_items(self, count: int, min_mods: int = 1) -> list:
+        if self.item_store is not None and self.item_store.items is self.items:
+            return self.item_store.select(self.item_store.top_indexes(count, min_mods))
+        return heapq.nlargest(count, (item for item in self.items if len(item.mods_matched) >= min_mods),
+                              key=lambda item: len(item.mods_matched))
 
     @staticmethod
-    def copy_info(item_data: dict, item: Item) -> None:
+    def copy_info(item_data: dict, item: Item, stash_name: str = None) -> None:
         item.x = item_data['x']
         item.y = item_data['y']
         item.height = item_data['h']
         item.width = item_data['w']
         item.ilvl = item_data['ilvl']
+        item.stash_name = stash_name
         if 'implicitMods' in item_data:
-            item.implicits = str(item_data['implicitMods']).split(',')
+            item.implicits = ModsContainer.normalize_mods(item_data['implicitMods'])
         if 'explicitMods' in item_data:
-            item.explicits = str(item_data['explicitMods']).lower().split(',')
+            item.explicits = ModsContainer.normalize_mods(item_data['explicitMods'])
 
+    # Returns False if item base is unknown
     @staticmethod
-    def determine_categories(item_data: dict, item: Item) -> None:
-        for category1 in item_bases:
-            for category2 in item_bases[category1]:
-                for base in item_bases[category1][category2]:
-                    if base.lower() in str(item_data['typeLine']).lower():
-                        item.category1 = category1.lower()
-                        item.category2 = category2.lower()
-                        item.base = base
-                        item.name = item_data['name']
-                        return
+    def determine_categories(item_data: dict, item: Item) -> bool:
+        found = base_index.resolve(str(item_data['typeLine']), item_data.get('baseType'))
+        if not found:
+            return False
+        item.category1, item.category2, item.base = found
+        item.name = item_data['name']
+        return True
 
     # two-handed weapon (including bow) OR 1h + shield OR 2 one-handed OR 2 shields
     # helmet, chest, gloves, boots, belt, amulet, 2x ring
 
+    # Returns {slot: items} of regal (ilvl 75+) and chaos (ilvl 60-74) items, items below ilvl 60 are dropped
     def split_items_to_dicts(self) -> [dict, dict]:
         items_chaos = {}
         items_regal = {}
+        items = []
         for item in self.items:
             if item.ilvl < 60:
-                self.items.remove(item)
                 continue
-            elif 60 <= item.ilvl <= 74:
-                items = items_chaos
-            else:
-                items = items_regal
-
-            if item.category2 in one_handed or item.category2 in two_handed:
-                items.setdefault('weapon', []).append(item)
-            elif item.category2 == 'helmet':
-                items.setdefault('helmet', []).append(item)
-            elif item.category2 == 'chest':
-                items.setdefault('chest', []).append(item)
-            elif item.category2 == 'gloves':
-                items.setdefault('gloves', []).append(item)
-            elif item.category2 == 'boots':
-                items.setdefault('boots', []).append(item)
-            elif item.category2 == 'belt':
-                items.setdefault('belt', []).append(item)
-            elif item.category2 == 'amulet':
-                items.setdefault('amulet', []).append(item)
-            elif item.category2 == 'ring':
-                items.setdefault('ring', []).append(item)
-
-        items_regal = OrderedDict(sorted(items_regal.items(), key=lambda x: len(x[1])))
-        items_chaos = OrderedDict(sorted(items_chaos.items(), key=lambda x: len(x[1])))
+            items.append(item)
+            slot = chaos_recipe_slots.get(item.category2)
+            if slot:
+                (items_chaos if item.ilvl <= 74 else items_regal).setdefault(slot, []).append(item)
+        self.items = items
         return items_regal, items_chaos
 
-    # Creates sets of items for chaos recipe. At least one item has to be 60 < ilvl < 75, others can be ilvl >= 75
+    # Creates sets of items for chaos recipe. At least one item has to be 60 < ilvl < 75, others can be ilvl >= 75.
+    # Without fill_greedy every set gets exactly one chaos item. Sets are kept between runs, see ChaosSetModel.
     def create_chaos_sets(self) -> None:
         items_regal, items_chaos = self.split_items_to_dicts()
-        set_tmp = {'weapon': [], 'ring': [], 'helmet': [], 'chest': [], 'gloves': [], 'boots': [],
-                   'belt': [], 'amulet': []}
-
-        while len(items_chaos.values()) > 0:
-            # Fill set with regal items
-            regal_tmp = list(items_regal.items())
-            for key, values in regal_tmp:
-                if not set_tmp[key] and len(items_regal[key]) > 0:
-                    set_tmp[key].append(values[0])
-                    items_regal[key].remove(values[0])
-                    if key == 'ring':
-                        if len(items_regal[key]) > 0:
-                            set_tmp[key].append(values[0])
-                            items_regal[key].remove(values[0])
-                    if key == 'weapon' and set_tmp[key][0].category2 in one_handed and items_regal[key]:
-                        try:
-                            weapon_tmp_one = next(x for x in iter(items_regal[key]) if x.category2 in one_handed)
-                        except StopIteration as e:
-                            weapon_tmp_one = None
-                        if weapon_tmp_one:
-                            set_tmp[key].append(weapon_tmp_one)
-                            items_regal[key].remove(weapon_tmp_one)
-
-            # Fill in with chaos items
-            chaos_added = 0
-            for key in set_tmp:
-                if key in items_chaos:
-                    if not set_tmp[key]:
-                        if len(items_chaos[key]) > 0:
-                            item_tmp = items_chaos[key][-1]
-                            set_tmp[key].append(item_tmp)
-                            items_chaos[key].pop(-1)
-                            chaos_added += 1
-                            if item_tmp.category2 == "ring":
-                                if len(items_chaos[key]) > 0:
-                                    item_tmp = items_chaos[key][-1]
-                                    set_tmp[key].append(item_tmp)
-                                    items_chaos[key].pop(-1)
-                                    chaos_added += 1
-                                else:
-                                    return
-                            elif item_tmp.category2 in one_handed and items_chaos[key]:
-                                try:
-                                    weapon_tmp_one = next(x for x in iter(items_chaos[key]) if x.category2 in one_handed)
-                                except StopIteration as e:
-                                    weapon_tmp_one = None
-                                if weapon_tmp_one:
-                                    set_tmp[key].append(weapon_tmp_one)
-                                    items_chaos[key].remove(weapon_tmp_one)
-                                    chaos_added += 1
-                        else:
-                            return
-                    elif key == 'ring' and len(set_tmp[key]) < 2:
-                        if len(items_chaos[key]) > 0:
-                            set_tmp[key].append(items_chaos[key][-1])
-                            items_chaos[key].pop(-1)
-                            chaos_added += 1
-                        else:
-                            return
-                    elif key == 'weapon' and len(set_tmp[key]) < 2 \
-                            and set_tmp[key][0].category2 in one_handed:
-                        if len(items_chaos[key]) > 0:
-                            weapon_tmp_one = next(x for x in iter(items_chaos[key]) if x.category2 in one_handed)
-                            if weapon_tmp_one:
-                                set_tmp[key].append(weapon_tmp_one)
-                                items_chaos[key].remove(weapon_tmp_one)
-                                chaos_added += 1
-                            else:
-                                return
-                        else:
-                            return
-
-            # If all items are from regal recipe replace one of them with chaos recipe item
-            if chaos_added == 0:
-                most_common_chaos = list(items_chaos.keys())[-1]
-                if items_chaos[most_common_chaos]:
-                    items_regal[most_common_chaos].append(set_tmp[most_common_chaos][0])
-                    set_tmp[most_common_chaos][0] = items_chaos[most_common_chaos][-1]
-                    items_chaos[most_common_chaos].pop(-1)
-                    chaos_added += 1
-                else:
-                    return
-
-            if chaos_added > 1 and not self.fill_greedy:
-                return
-
-            # Do not add set if there is any item missing
-            if any(value == [] for value in set_tmp.values()) or len(set_tmp['ring']) < 2 or \
-                    (set_tmp['weapon'][0].category2 in one_handed and len(set_tmp['weapon']) < 2):
-                return
-
-            self.chaos_sets.append(copy.deepcopy(set_tmp))
-            set_tmp = {'weapon': [], 'ring': [], 'helmet': [], 'chest': [], 'gloves': [], 'boots': [],
-                       'belt': [], 'amulet': []}
+        self.chaos_model.update(items_chaos, items_regal, one_chaos_item=not self.fill_greedy,
+                                stash_names=self._stash_names_to_request())
+        self.chaos_sets = self.chaos_model.sets
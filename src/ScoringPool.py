@@ -0,0 +1,60 @@
+from concurrent.futures import ProcessPoolExecutor
+from src.ItemScorer import ItemScorer
+
+MIN_ITEMS_FOR_POOL = 5000  # Sending smaller batches to other processes takes longer than scoring them here
+CHUNK_SIZE = 2000
+
+
+# Runs in worker process. Gets only normalized mods of items and filters of their categories,
+# returns (index of item in chunk, matched mods, totals) for items with any matched mod or total.
+def _score_chunk(category_filters: dict, chunk: list) -> list:
+    results = []
+    for index, (category, explicits) in enumerate(chunk):
+        mods_matched, totals = ItemScorer.match_mods(explicits, *category_filters[category])
+        if mods_matched or totals:
+            results.append((index, dict(mods_matched), dict(totals) if totals else None))
+    return results
+
+
+# Optional process pool for scoring big scans (many dump tabs) on all CPU cores, scoring is pure Python and holds GIL.
+# Results are the same as from ItemScorer.score().
+class ScoringPool:
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.executor = ProcessPoolExecutor(max_workers=processes)
+
+    def score(self, items: list) -> None:
+        if len(items) < MIN_ITEMS_FOR_POOL:
+            ItemScorer.score(items)
+            return
+
+        category_filters = {}
+        items_to_send = []
+        for item in items:
+            if not item.base:
+                continue  # Not supported item base, skipped as in ItemScorer
+            category = (item.category1, item.category2)
+            if category not in category_filters:
+                category_filters[category] = ItemScorer.get_category_filter(category)
+            # Containers are created here, workers send back only items which have anything to put there
+            item.mods_matched, item.totals = ItemScorer.match_mods((), *category_filters[category])
+            if item.mods_matched is not None:
+                items_to_send.append(item)  # Items without any filter for their category don't need to be sent
+        items = items_to_send
+
+        futures = []
+        for start in range(0, len(items), CHUNK_SIZE):
+            chunk_items = items[start:start + CHUNK_SIZE]
+            chunk = [((item.category1, item.category2), item.explicits) for item in chunk_items]
+            chunk_filters = {category: category_filters[category] for category, _ in chunk}
+            futures.append((chunk_items, self.executor.submit(_score_chunk, chunk_filters, chunk)))
+        for chunk_items, future in futures:
+            for index, mods_matched, totals in future.result():
+                item = chunk_items[index]
+                item.mods_matched.update(mods_matched)
+                item.totals = totals
+
+    # Worker processes have to be joined before interpreter exit, otherwise the executor's management thread can
+    # fail on already closed pipes
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
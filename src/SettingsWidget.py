@@ -7,7 +7,7 @@ from PyQt5.QtWidgets import *
 from src.PainterWidget import PainterWidget
 from src.DragWidget import DragWidget
 from src.Slider import Slider
-from src.utils import log_method_name, prepare_cfg, load_styles, default_league_name, xml_indent
+from src.utils import log_method_name, prepare_cfg, load_styles, default_league_name, default_api_url, xml_indent
 from src.ModsContainer import CONFIG_PATH, FILTER_DIR, DEFAULT_FILTER_PATH
 
 slider_colors = ["brown", "green", "blue", "yellow", "white"]
@@ -31,6 +31,10 @@ class SettingsWidget(DragWidget):
         self.mode = "chaos_recipe"  # default mode
         self.allow_identified = False
         self.fill_greedy = True
+        self.fetch_all_stashes = False
+        self.offline_mode = False
+        self.snapshot_max_age = 0
+        self.scoring_processes = 0
         self.show_amulets = True
         self.show_rings = True
         self.show_belts = True
@@ -139,6 +143,32 @@ class SettingsWidget(DragWidget):
         layout_radio.addWidget(QLabel("Fill chaos recipe with more than one ilvl < 75 item"))
         layout_main.addLayout(layout_radio)
 
+        self.radio_fetch_all_stashes = QRadioButton()
+        self.radio_fetch_all_stashes.setAutoExclusive(False)
+        self.radio_fetch_all_stashes.setChecked(self.fetch_all_stashes)
+        self.radio_fetch_all_stashes.clicked.connect(self.switch_fetch_all_stashes)
+        layout_radio = QHBoxLayout()
+        layout_radio.setAlignment(Qt.AlignLeft)
+        layout_radio.addWidget(self.radio_fetch_all_stashes)
+        layout_radio.addWidget(QLabel("Request all stashes at once"))
+        layout_main.addLayout(layout_radio)
+
+        self.radio_offline_mode = QRadioButton()
+        self.radio_offline_mode.setAutoExclusive(False)
+        self.radio_offline_mode.setChecked(self.offline_mode)
+        self.radio_offline_mode.clicked.connect(self.switch_offline_mode)
+        layout_radio = QHBoxLayout()
+        layout_radio.setAlignment(Qt.AlignLeft)
+        layout_radio.addWidget(self.radio_offline_mode)
+        layout_radio.addWidget(QLabel("Offline mode, use only stashes saved during previous requests"))
+        layout_main.addLayout(layout_radio)
+
+        layout_main.addWidget(QLabel("Use saved stash if younger than (seconds, 0 - always request)"))
+        self.snapshot_max_age_text = QLineEdit(str(self.snapshot_max_age))
+        self.snapshot_max_age_text.setValidator(QIntValidator(0, 1000000))
+        self.snapshot_max_age_text.textChanged.connect(self.save_cfg)
+        layout_main.addWidget(self.snapshot_max_age_text)
+
         self.radio_show_amulets = QRadioButton()
         self.radio_show_amulets.setAutoExclusive(False)
         self.radio_show_amulets.setChecked(self.show_amulets)
@@ -344,6 +374,7 @@ class SettingsWidget(DragWidget):
             self.stashes.append(stash)
         if self.stashes:
             self.active_stash = [self.stashes[0]["name"], 0, self.stashes[0]["type"]]
+            self.painter_widget.stash_name = self.active_stash[0]
         # mod_file should probably be validated upon loading (for existence)
         self.mod_file = self._cfg_load_or_default(root, "mod_file", DEFAULT_FILTER_PATH)
         self.league = self._cfg_load_or_default(root, "league")
@@ -354,6 +385,9 @@ class SettingsWidget(DragWidget):
         self.mode = self._cfg_load_or_default(root, "mode", "chaos_recipe")
         self.allow_identified = self._cfg_load_or_default(root, "allow_identified", "False") == "True"
         self.fill_greedy = self._cfg_load_or_default(root, "fill_greedy", "True") == "True"
+        self.fetch_all_stashes = self._cfg_load_or_default(root, "fetch_all_stashes", "False") == "True"
+        self.offline_mode = self._cfg_load_or_default(root, "offline_mode", "False") == "True"
+        self.snapshot_max_age = int(self._cfg_load_or_default(root, "snapshot_max_age", "0"))
         self.show_amulets = self._cfg_load_or_default(root, "show_amulets", "True") == "True"
         self.show_rings = self._cfg_load_or_default(root, "show_rings", "True") == "True"
         self.show_belts = self._cfg_load_or_default(root, "show_belts", "True") == "True"
@@ -362,6 +396,10 @@ class SettingsWidget(DragWidget):
         self.poe_filter_path = self._cfg_load_or_default(root, "filter_path", "Set PoE filter file location")
         self.poe_filter_name = self._cfg_load_or_default(root, "filter_name", "")
         self.maximum_chaos_sets = int(self._cfg_load_or_default(root, "max_chaos_sets", "16"))
+        # Can be changed only in config file, e.g. to use local server from StandInServer.py
+        self.api_url = self._cfg_load_or_default(root, "api_url", default_api_url)
+        # Number of processes scoring rare scanner items, 0 scores in Requester thread, for very big scans only
+        self.scoring_processes = int(self._cfg_load_or_default(root, "scoring_processes", "0"))
 
         self._set_values_from_cfg()
 
@@ -417,6 +455,11 @@ class SettingsWidget(DragWidget):
         self._cfg_set_or_create(root, "mode", self.mode)
         self._cfg_set_or_create(root, "allow_identified", str(self.allow_identified))
         self._cfg_set_or_create(root, "fill_greedy", str(self.fill_greedy))
+        self._cfg_set_or_create(root, "fetch_all_stashes", str(self.fetch_all_stashes))
+        self._cfg_set_or_create(root, "offline_mode", str(self.offline_mode))
+        if hasattr(self, "snapshot_max_age_text"):
+            self.snapshot_max_age = int(self.snapshot_max_age_text.text() or "0")
+        self._cfg_set_or_create(root, "snapshot_max_age", str(self.snapshot_max_age))
         self._cfg_set_or_create(root, "show_amulets", str(self.show_amulets))
         self._cfg_set_or_create(root, "show_rings", str(self.show_rings))
         self._cfg_set_or_create(root, "show_belts", str(self.show_belts))
@@ -440,6 +483,7 @@ class SettingsWidget(DragWidget):
         self.painter_widget.update()
         if self.stashes and not self.active_stash[0]:
             self.active_stash = [self.stashes[0]["name"], 0, self.stashes[0]["type"]]
+            self.painter_widget.stash_name = self.active_stash[0]
 
         self.configuration_changed.emit(self.get_settings_for_requester())  # Notify Requester
 
@@ -482,6 +526,12 @@ class SettingsWidget(DragWidget):
         return {
             "account_name": self.edit_account_name.text(),
             "stash_name": self.active_stash[0],
+            "stash_names": [stash["name"] for stash in self.stashes if stash["name"]],
+            "fetch_all_stashes": self.fetch_all_stashes,
+            "offline_mode": self.offline_mode,
+            "snapshot_max_age": self.snapshot_max_age,
+            "api_url": self.api_url,
+            "scoring_processes": self.scoring_processes,
             "league": self.combo_league.currentText(),
             "session_id": self.edit_session.text(),
             "mod_file": FILTER_DIR + self.combo_mod_file.currentText(),
@@ -511,6 +561,8 @@ class SettingsWidget(DragWidget):
         else:
             self.active_stash = [self.stashes[0]["name"], 0, self.stashes[0]["type"]]
         self.painter_widget.stash_type = self.active_stash[2]
+        self.painter_widget.stash_name = self.active_stash[0]
+        self.painter_widget.update()
 
     def set_prev_active_stash(self):
         index = self.active_stash[1] - 1
@@ -520,6 +572,8 @@ class SettingsWidget(DragWidget):
             index = len(self.stashes) - 1
             self.active_stash = [self.stashes[index]["name"], index, self.stashes[index]["type"]]
         self.painter_widget.stash_type = self.active_stash[2]
+        self.painter_widget.stash_name = self.active_stash[0]
+        self.painter_widget.update()
 
     def switch_allow_identified(self):
         self.allow_identified = self.radio_allow_identified.isChecked()
@@ -529,6 +583,14 @@ class SettingsWidget(DragWidget):
         self.fill_greedy = self.radio_fill_greedy.isChecked()
         self.save_cfg()
 
+    def switch_fetch_all_stashes(self):
+        self.fetch_all_stashes = self.radio_fetch_all_stashes.isChecked()
+        self.save_cfg()
+
+    def switch_offline_mode(self):
+        self.offline_mode = self.radio_offline_mode.isChecked()
+        self.save_cfg()
+
     def switch_show_amulets(self):
         self.show_amulets = self.radio_show_amulets.isChecked()
         self.save_cfg()
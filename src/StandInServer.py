@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+
+# Local stand-in for GGG character-window/get-stash-items API, allows to run and measure Requester without
+# a real session ID. Serves synthetic stashes or stashes recorded in snapshots directory, can simulate latency,
+# rate limits and errors. To use it, start the server and set api_url in config.xml, e.g.:
+#   python -m src.StandInServer --port 8080 --tabs 10 --latency 0.2
+#   <api_url>http://127.0.0.1:8080/character-window/get-stash-items</api_url>
+
+import argparse
+import gzip
+import json
+import os
+import random
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Lock
+from urllib.parse import urlparse, parse_qs, unquote
+from src.ModsContainer import item_bases
+
+API_PATH = "/character-window/get-stash-items"
+
+# Size in stash cells for each category2, everything not listed here is 2x2
+item_sizes = {'ring': (1, 1), 'amulet': (1, 1), 'belt': (2, 1), 'chest': (2, 3), 'quiver': (2, 3), 'bow': (2, 4),
+              'staff': (2, 4), 'twoaxe': (2, 4), 'twomace': (2, 4), 'twosword': (2, 4), 'claw': (2, 2),
+              'dagger': (1, 3), 'sceptre': (1, 3), 'wand': (1, 3), 'oneaxe': (2, 3), 'onemace': (1, 3),
+              'onesword': (1, 3), 'base': (1, 1), 'abyss': (1, 1), 'cluster': (1, 1)}
+
+mod_templates = ['+{} to maximum Life', '+{} to maximum Mana', '+{} to maximum Energy Shield', '+{} to Strength',
+                 '+{} to Dexterity', '+{} to Intelligence', '+{}% to Fire Resistance', '+{}% to Cold Resistance',
+                 '+{}% to Lightning Resistance', '+{}% to Chaos Resistance', '{}% increased Spell Damage',
+                 '{}% increased Armour', '{}% increased Evasion Rating', '{}% increased Rarity of Items found',
+                 '{}% increased Attack Speed', '{}% increased Cast Speed', 'Adds {} to {} Fire Damage to Attacks',
+                 'Adds {} to {} Cold Damage to Attacks', '{}% increased Movement Speed', '+{} to Accuracy Rating']
+
+
+def generate_item(index: int, x: int, y: int, width: int, height: int, category2: str, base: str) -> dict:
+    frame_type = 2 if random.random() < 0.8 else 1
+    identified = random.random() < 0.5
+    mods_count = random.randint(1, 6) if frame_type == 2 else random.randint(1, 2)
+    item = {
+        'id': '{:064x}'.format(random.getrandbits(256)),
+        'x': x, 'y': y, 'w': width, 'h': height,
+        'ilvl': random.randint(55, 86),
+        'frameType': frame_type,
+        'identified': identified,
+        'name': 'Stand-in Item ' + str(index) if frame_type == 2 else '',
+        'typeLine': base,
+        'baseType': base,
+        'inventoryId': 'Stash1'
+    }
+    if identified:
+        item['explicitMods'] = [template.format(*[random.randint(1, 120) for _ in range(template.count('{}'))])
+                                for template in random.sample(mod_templates, mods_count)]
+    if width * height >= 4 and category2 not in ('quiver', 'belt'):
+        item['sockets'] = [{'group': 0, 'attr': 'S'} for _ in range(random.randint(1, min(width * height, 6)))]
+    return item
+
+
+def generate_stash(items_count: int, quad: bool) -> list:
+    cells = 24 if quad else 12
+    taken = [[False] * cells for _ in range(cells)]
+    bases = [(category2, base) for category1 in item_bases.values() for category2, bases in category1.items()
+             for base in bases]
+    small_bases = [(category2, base) for category2, base in bases if item_sizes.get(category2) == (1, 1)]
+    items = []
+    for x in range(cells):
+        for y in range(cells):
+            if len(items) >= items_count:
+                return items
+            if taken[x][y]:
+                continue
+            category2, base = random.choice(bases)
+            width, height = item_sizes.get(category2, (2, 2))
+            if x + width > cells or y + height > cells or \
+                    any(taken[i][j] for i in range(x, x + width) for j in range(y, y + height)):
+                # Fill the gap with something small
+                category2, base = random.choice(small_bases)
+                width, height = 1, 1
+            for i in range(x, x + width):
+                for j in range(y, y + height):
+                    taken[i][j] = True
+            items.append(generate_item(len(items), x, y, width, height, category2, base))
+    return items
+
+
+# Snapshots saved by Requester are named account+league+stash+hash (percent-encoded), other files by stash name
+def recorded_stash_name(file_name: str) -> str:
+    name = file_name[:-len(".json.gz")] if file_name.endswith(".json.gz") else file_name[:-len(".json")]
+    parts = name.split('+')
+    return unquote(parts[2]) if len(parts) == 4 else name
+
+
+def load_recorded_stashes(directory: str) -> list:
+    # Snapshots saved by Requester or other saved responses, see recorded_stash_name()
+    stashes = []
+    for file_name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, file_name)
+        if file_name.endswith(".json.gz"):
+            with gzip.open(path, "rt", encoding="utf8") as file:
+                items = json.load(file).get('items', [])
+        elif file_name.endswith(".json"):
+            with open(path, "r", encoding="utf8") as file:
+                items = json.load(file).get('items', [])
+        else:
+            continue
+        quad = any(item['x'] >= 12 or item['y'] >= 12 for item in items)
+        stashes.append({'name': recorded_stash_name(file_name), 'quad': quad, 'items': items})
+    return stashes
+
+
+class StandInState:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.lock = Lock()
+        self.hits = deque()
+        self.blocked_until = 0.0
+        if args.fixtures:
+            self.stashes = load_recorded_stashes(args.fixtures)
+        else:
+            self.stashes = []
+            for index in range(args.tabs):
+                quad = index < args.quad_tabs
+                self.stashes.append({'name': 'Stash' + str(index), 'quad': quad,
+                                     'items': generate_stash(args.items_quad if quad else args.items_normal, quad)})
+        self.limit_hits, self.limit_period, self.limit_penalty = map(int, args.rate_limit.split(':'))
+
+    def register_hit(self) -> (str, float):
+        # Returns state header value and number of seconds client needs to wait, 0 if request is allowed
+        with self.lock:
+            now = time.time()
+            while self.hits and now - self.hits[0] >= self.limit_period:
+                self.hits.popleft()
+            if self.blocked_until <= now:
+                self.hits.append(now)
+                if len(self.hits) > self.limit_hits:
+                    self.blocked_until = now + self.limit_penalty
+            restricted = max(int(self.blocked_until - now + 0.999), 0)
+            state = '{}:{}:{}'.format(len(self.hits), self.limit_period, restricted)
+            return state, restricted
+
+    def tabs_json(self) -> list:
+        return [{'n': stash['name'], 'i': index, 'id': 'stand-in-' + str(index),
+                 'type': 'QuadStash' if stash['quad'] else 'NormalStash'} for index, stash in enumerate(self.stashes)]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    state = None  # StandInState, set before server starts
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path != API_PATH:
+            self._send(404, {'error': {'code': 1, 'message': 'Resource not found'}})
+            return
+        args = self.state.args
+        if args.latency:
+            time.sleep(max(random.gauss(args.latency, args.latency / 4), 0))
+
+        rate_state, retry_after = self.state.register_hit()
+        headers = {'X-Rate-Limit-Policy': 'backend-character-request-limit',
+                   'X-Rate-Limit-Rules': 'Account',
+                   'X-Rate-Limit-Account': args.rate_limit,
+                   'X-Rate-Limit-Account-State': rate_state}
+        if retry_after:
+            headers['Retry-After'] = str(retry_after)
+            self._send(429, {'error': {'code': 3, 'message': 'Rate limit exceeded'}}, headers)
+            return
+        if random.random() < args.error_rate:
+            self._send(500, {'error': {'code': 2, 'message': 'Internal error'}}, headers)
+            return
+        if args.session_id and 'POESESSID=' + args.session_id not in self.headers.get('Cookie', ''):
+            self._send(403, {'error': {'code': 6, 'message': 'Forbidden'}}, headers)
+            return
+
+        query = parse_qs(url.query)
+        tab_index = int(query.get('tabIndex', ['0'])[0])
+        if tab_index < 0 or tab_index >= len(self.state.stashes):
+            self._send(200, {'error': {'code': 1, 'message': 'Resource not found'}}, headers)
+            return
+        stash = self.state.stashes[tab_index]
+        response = {'numTabs': len(self.state.stashes), 'quadLayout': stash['quad']}
+        if query.get('tabs', ['0'])[0] == '1':
+            response['tabs'] = self.state.tabs_json()
+        response['items'] = stash['items']
+        self._send(200, response, headers)
+
+    def _send(self, code: int, response: dict, headers: dict = None) -> None:
+        body = json.dumps(response).encode('utf8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        if not self.state.args.quiet:
+            super().log_message(format, *args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Local stand-in for GGG get-stash-items API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--tabs', type=int, default=10, help='number of synthetic stashes')
+    parser.add_argument('--quad-tabs', type=int, default=2, help='how many of synthetic stashes are quad stashes')
+    parser.add_argument('--items-normal', type=int, default=60, help='maximum items in synthetic normal stash')
+    parser.add_argument('--items-quad', type=int, default=400, help='maximum items in synthetic quad stash')
+    parser.add_argument('--fixtures', help='directory with recorded stashes (.json or .json.gz), replaces synthetic')
+    parser.add_argument('--latency', type=float, default=0.0, help='mean response delay in seconds')
+    parser.add_argument('--rate-limit', default='45:60:60', help='hits:period:penalty sent in rate limit headers')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='part of requests failing with code 500')
+    parser.add_argument('--session-id', default='', help='required POESESSID, any is accepted if empty')
+    parser.add_argument('--seed', type=int, default=None, help='seed of synthetic stashes generator')
+    parser.add_argument('--quiet', action='store_true', help='do not log requests')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    StandInHandler.state = StandInState(args)
+    server = ThreadingHTTPServer((args.host, args.port), StandInHandler)
+    print('Serving {} stashes on http://{}:{}{}'.format(len(StandInHandler.state.stashes), args.host, args.port,
+                                                         API_PATH))
+    for tab in StandInHandler.state.tabs_json():
+        print('  {} ({})'.format(tab['n'], tab['type']))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
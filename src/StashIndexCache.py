@@ -0,0 +1,72 @@
+import os
+import time
+import xml.etree.ElementTree as ElementTree
+from threading import Lock
+from src.ModsContainer import STASH_CACHE_PATH
+from src.utils import xml_indent
+
+STASH_INDEX_TTL = 6 * 60 * 60  # seconds, after that stash list is requested again
+
+
+# Remembers stash name -> stash index mapping for each account and league, so we don't need to request stash list
+# before every items request. Saved to file to survive program restarts, e.g.:
+# <root>
+#   <stashes account="name" league="Sentinel" time="1660000000.0" num_tabs="25">
+#     <stash index="3">dump1</stash>
+#   </stashes>
+# </root>
+class StashIndexCache:
+    def __init__(self, path: str = STASH_CACHE_PATH):
+        self.path = path
+        self.lock = Lock()
+        self.entries = {}  # (account, league) -> {"time": float, "num_tabs": int, "stashes": {name: index}}
+        self._load()
+
+    def get(self, account_name: str, league: str) -> dict:
+        # Returns None if there is no entry or it is too old
+        with self.lock:
+            entry = self.entries.get((account_name, league))
+            if not entry or time.time() - entry["time"] > STASH_INDEX_TTL:
+                return None
+            return entry
+
+    def update(self, account_name: str, league: str, stashes: dict, num_tabs: int) -> None:
+        with self.lock:
+            self.entries[(account_name, league)] = {"time": time.time(), "num_tabs": num_tabs,
+                                                    "stashes": dict(stashes)}
+            self._save()
+
+    def invalidate(self, account_name: str, league: str) -> None:
+        with self.lock:
+            if self.entries.pop((account_name, league), None):
+                self._save()
+
+    def _load(self) -> None:
+        if not os.path.isfile(self.path):
+            return
+        try:
+            root = ElementTree.parse(self.path).getroot()
+        except ElementTree.ParseError:
+            return  # Broken cache file, it will be overwritten with next update
+        for node in root.findall('stashes'):
+            stashes = {stash.text: int(stash.attrib['index']) for stash in node.findall('stash')}
+            self.entries[(node.attrib['account'], node.attrib['league'])] = {
+                "time": float(node.attrib['time']),
+                "num_tabs": int(node.attrib['num_tabs']),
+                "stashes": stashes
+            }
+
+    def _save(self) -> None:
+        root = ElementTree.Element("root")
+        for (account_name, league), entry in self.entries.items():
+            node = ElementTree.SubElement(root, "stashes")
+            node.set("account", account_name)
+            node.set("league", league)
+            node.set("time", str(entry["time"]))
+            node.set("num_tabs", str(entry["num_tabs"]))
+            for name, index in entry["stashes"].items():
+                stash = ElementTree.SubElement(node, "stash")
+                stash.text = name
+                stash.set("index", str(index))
+        xml_indent(root)
+        ElementTree.ElementTree(root).write(self.path)
@@ -0,0 +1,78 @@
+import gzip
+import hashlib
+import os
+import time
+from urllib.parse import quote
+from src.ModsContainer import SNAPSHOT_DIR
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+# Writes response text into a temporary file, it replaces the snapshot only after commit() is called,
+# so a snapshot being read is never half written and failed responses don't overwrite good ones
+class SnapshotWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.file = gzip.open(self.tmp_path, "wt", encoding="utf8")
+        self.committed = False
+
+    def write(self, chunk: str) -> None:
+        self.file.write(chunk)
+
+    def commit(self) -> None:
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        self.committed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if not self.committed:
+            self.file.close()
+            os.remove(self.tmp_path)
+
+
+# Stores the last items response of every requested stash on disk (gzip compressed JSON), so the same stash can be
+# processed again without a request, e.g. after filter modification, program restart or in offline mode.
+# Snapshot age is taken from file modification time.
+class StashSnapshots:
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        self.directory = directory
+
+    # Parts are percent-encoded and joined with "+", which quote() always encodes, so different names never share
+    # a file. Hash of the name is added because Windows file names ignore letter case ("Dump" and "dump" tabs).
+    def path(self, account_name: str, league: str, stash_name: str) -> str:
+        name = "+".join(quote(part, safe='') for part in (account_name, league, stash_name))
+        name += "+" + hashlib.sha1(name.encode("utf8")).hexdigest()[:8]
+        return os.path.join(self.directory, name + ".json.gz")
+
+    def age(self, account_name: str, league: str, stash_name: str) -> float:
+        # Seconds since snapshot was saved, None if there is no snapshot
+        path = self.path(account_name, league, stash_name)
+        if not os.path.isfile(path):
+            return None
+        return time.time() - os.path.getmtime(path)
+
+    def exists(self, account_name: str, league: str, stash_name: str) -> bool:
+        return self.age(account_name, league, stash_name) is not None
+
+    def writer(self, account_name: str, league: str, stash_name: str) -> SnapshotWriter:
+        os.makedirs(self.directory, exist_ok=True)
+        return SnapshotWriter(self.path(account_name, league, stash_name))
+
+    def read_chunks(self, account_name: str, league: str, stash_name: str, max_age: float = None):
+        # Returns generator of saved response text, None if there is no snapshot or it is older than max_age seconds
+        age = self.age(account_name, league, stash_name)
+        if age is None or (max_age is not None and age > max_age):
+            return None
+        return self._read_chunks(self.path(account_name, league, stash_name))
+
+    @staticmethod
+    def _read_chunks(path: str):
+        with gzip.open(path, "rt", encoding="utf8") as file:
+            chunk = file.read(READ_CHUNK_SIZE)
+            while chunk:
+                yield chunk
+                chunk = file.read(READ_CHUNK_SIZE)
@@ -10,6 +10,7 @@ last_logged_method_name = ""
 last_logged_error = ""
 styles_file = PROJECT_ROOT + "/styles/styles.css"
 default_league_name = "Sentinel"
+default_api_url = "https://www.pathofexile.com/character-window/get-stash-items"
 
 
 def load_styles(object_instance: QWidget) -> None: